@@ -1,5 +1,8 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
+from user_auth_app.blacklist import blacklist_filter
+from user_auth_app.cache import token_user_cache
 from django.contrib.auth import get_user_model
 
 
@@ -50,4 +53,24 @@ def other_auth_client(other_user):
     }, format="json")
 
     assert response.status_code == 200
-    return client
\ No newline at end of file
+    return client
+
+@pytest.fixture(autouse=True)
+def eager_quiz_jobs(settings):
+    """Run quiz generation jobs inline so tests never depend on worker threads."""
+    settings.QUIZ_JOBS_EAGER = True
+    settings.QUIZ_JOB_WORKER_THREADS = 0
+    settings.AUDIO_STREAMING = False
+    settings.GEMINI_REQUESTS_PER_MINUTE = 0
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses and users must not leak between tests that reuse ids."""
+    cache.clear()
+    token_user_cache.clear()
+    blacklist_filter.reset()
+    yield
+    cache.clear()
+    token_user_cache.clear()
+    blacklist_filter.reset()
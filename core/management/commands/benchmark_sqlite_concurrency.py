@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.test.utils import override_settings
+
+from quizly_app.serializers import quiz_detail_data
+from quizly_app.services import create_quiz_with_questions
+
+
+User = get_user_model()
+
+# The SQLite defaults before SQLITE_PRAGMAS and the IMMEDIATE transaction mode existed.
+ROLLBACK_JOURNAL_PRAGMAS = {"journal_mode": "delete", "synchronous": "full", "busy_timeout": 0}
+ROLLBACK_JOURNAL_TRANSACTION_MODE = None
+
+
+@contextmanager
+def transaction_mode(mode):
+    """
+    Use `mode` for connections opened inside the block. Every thread's
+    connection is built from the same settings dict, so changing it there
+    covers the benchmark threads too.
+    """
+    options = connections.settings[DEFAULT_DB_ALIAS].setdefault("OPTIONS", {})
+    original = options.get("transaction_mode")
+    options["transaction_mode"] = mode
+    try:
+        yield
+    finally:
+        options["transaction_mode"] = original
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure quiz detail read throughput while quizzes are being created, "
+        "with SQLITE_PRAGMAS and (with --compare) the old defaults: rollback journal, no busy "
+        "timeout and deferred transactions. "
+        "Runs against the configured database and removes its data afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run.")
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=1)
+        parser.add_argument("--questions", type=int, default=10, help="Questions per created quiz.")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also run with the rollback journal, no busy timeout and deferred transactions.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark only applies to SQLite databases.")
+
+        configured_mode = connection.settings_dict.get("OPTIONS", {}).get("transaction_mode")
+        runs = [("configured", getattr(settings, "SQLITE_PRAGMAS", {}), configured_mode)]
+        if options["compare"]:
+            runs.insert(0, ("rollback journal", ROLLBACK_JOURNAL_PRAGMAS, ROLLBACK_JOURNAL_TRANSACTION_MODE))
+
+        header = f"{'pragmas':<18} {'reads/s':>9} {'p95 ms':>8} {'writes/s':>9} {'lock errors':>12}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        name = f"benchmark-{uuid.uuid4().hex[:8]}"
+        user = User.objects.create_user(username=name, email=f"{name}@example.com")
+        try:
+            quiz_ids = [
+                create_quiz_with_questions(user, "https://example.com", self.quiz_data(options["questions"])).pk
+                for _ in range(20)
+            ]
+            for label, pragmas, mode in runs:
+                with transaction_mode(mode):
+                    self.stdout.write(self.run(label, pragmas, user, quiz_ids, options))
+        finally:
+            connections.close_all()
+            user.delete()
+
+    def quiz_data(self, size):
+        return {
+            "title": "Benchmark quiz",
+            "description": "Created by benchmark_sqlite_concurrency",
+            "questions": [
+                {
+                    "question_title": f"Question {i}?",
+                    "question_options": ["Paris", "London", "Berlin", "Rome"],
+                    "answer": "A",
+                }
+                for i in range(size)
+            ],
+        }
+
+    def run(self, label, pragmas, user, quiz_ids, options):
+        # Journal mode can only change while no other connection is open.
+        connections.close_all()
+
+        deadline = time.monotonic() + options["duration"]
+        latencies, writes, errors = [], [0], [0]
+        lock = threading.Lock()
+        data = self.quiz_data(options["questions"])
+
+        def reader():
+            local = []
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    quiz_detail_data(random.choice(quiz_ids), user)
+                except OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                local.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(local)
+
+        def writer():
+            while time.monotonic() < deadline:
+                try:
+                    create_quiz_with_questions(user, "https://example.com", data)
+                except OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                with lock:
+                    writes[0] += 1
+
+        def in_thread(target):
+            def wrapper():
+                try:
+                    target()
+                finally:
+                    connection.close()
+            return threading.Thread(target=wrapper)
+
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            threads = (
+                [in_thread(reader) for _ in range(options["readers"])]
+                + [in_thread(writer) for _ in range(options["writers"])]
+            )
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+        duration = options["duration"]
+
+        return (
+            f"{label:<18} {len(latencies) / duration:>9.0f} {p95:>8.2f} "
+            f"{writes[0] / duration:>9.1f} {errors[0]:>12}"
+        )
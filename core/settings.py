@@ -24,6 +24,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Dotted path to a callable returning a Gemini-compatible client (e.g. a local fake for offline runs).
+GEMINI_CLIENT_FACTORY = os.getenv("GEMINI_CLIENT_FACTORY")
+# Open the Gemini connection when a process starts instead of on the first request.
+GEMINI_WARMUP = os.getenv("GEMINI_WARMUP", "False") == "True"
+GEMINI_KEEPALIVE_EXPIRY = int(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "120"))
 
 
 # Quick-start development settings - unsuitable for production
@@ -112,13 +117,103 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE selects "sqlite" (default) or "postgres". Setting DB_REPLICA_NAME (sqlite)
+# or DB_REPLICA_HOST (postgres) adds a "replica" alias that serves quiz reads.
+
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DB_NAME", "quizly"),
+            "USER": os.getenv("DB_USER", "quizly"),
+            "PASSWORD": os.getenv("DB_PASSWORD", ""),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+    # psycopg's built-in pool replaces persistent connections (needs psycopg[pool]).
+    if os.getenv("DB_POOL", "False") == "True":
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        }
+    if os.getenv("DB_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.getenv("DB_REPLICA_HOST"),
+            "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+            "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_NAME", BASE_DIR / "db.sqlite3"),
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "0")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Take the write lock when a transaction starts, so busy_timeout applies
+                # instead of failing with "database is locked" on lock upgrade.
+                "transaction_mode": os.getenv("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+            },
+        }
     }
+    if os.getenv("DB_REPLICA_NAME"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "NAME": os.getenv("DB_REPLICA_NAME"),
+            "TEST": {"MIRROR": "default"},
+        }
+
+# Applied to every SQLite connection by core.signals.configure_sqlite.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "wal"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "normal"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),
+}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND selects "locmem" (default, per process), "file" or "db"
+# (run `python manage.py createcachetable` for "db").
+# Only "file" and "db" are shared between worker processes. With "locmem" an
+# edit only clears the cache of the process that made it, so other workers
+# may serve the old quiz until QUIZ_DETAIL_CACHE_TIMEOUT (30s by default).
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+
+CACHES = {
+    "default": {
+        "locmem": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "quizly",
+        },
+        "file": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        },
+        "db": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", "quizly_cache"),
+        },
+    }[CACHE_BACKEND]
 }
 
+QUIZ_DETAIL_CACHE_TIMEOUT = int(os.getenv("QUIZ_DETAIL_CACHE_TIMEOUT", "30" if CACHE_BACKEND == "locmem" else "3600"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -183,6 +278,102 @@ REST_FRAMEWORK = {
 }
 
 
+# Quiz generation jobs
+# Set QUIZ_JOB_WORKER_THREADS=0 when jobs are processed by `manage.py run_quiz_worker`.
+QUIZ_JOBS_EAGER = os.getenv("QUIZ_JOBS_EAGER", "False") == "True"
+QUIZ_JOB_WORKER_THREADS = int(os.getenv("QUIZ_JOB_WORKER_THREADS", "2"))
+QUIZ_JOB_POLL_INTERVAL = float(os.getenv("QUIZ_JOB_POLL_INTERVAL", "2"))
+# Running jobs refresh a heartbeat; one silent for QUIZ_JOB_TIMEOUT seconds is requeued.
+QUIZ_JOB_HEARTBEAT_INTERVAL = int(os.getenv("QUIZ_JOB_HEARTBEAT_INTERVAL", "30"))
+QUIZ_JOB_TIMEOUT = int(os.getenv("QUIZ_JOB_TIMEOUT", "900"))
+
+
+# Audio download
+# Pipe yt-dlp straight into ffmpeg in memory. The temp-file download is the fallback and also
+# takes audio over the 20 MB inline limit, so long videos get chunked transcription.
+AUDIO_STREAMING = os.getenv("AUDIO_STREAMING", "True") == "True"
+# One of downloader.services.AUDIO_ENCODE_PROFILES, e.g. "speech_opus_24k" for small speech uploads.
+AUDIO_ENCODE_PROFILE = os.getenv("AUDIO_ENCODE_PROFILE", "passthrough")
+# Scratch directories for downloads; removed after each run, orphans reaped by a janitor.
+# The quota is host-wide: it limits the total size of AUDIO_WORKSPACE_ROOT across
+# all workers sharing it, and new jobs wait while the root is over it.
+AUDIO_WORKSPACE_ROOT = os.getenv("AUDIO_WORKSPACE_ROOT")  # default: <tmp>/quizly-audio
+AUDIO_WORKSPACE_QUOTA_BYTES = int(os.getenv("AUDIO_WORKSPACE_QUOTA_BYTES", str(2 * 1024 ** 3)))
+AUDIO_WORKSPACE_QUOTA_WAIT = int(os.getenv("AUDIO_WORKSPACE_QUOTA_WAIT", "60"))
+AUDIO_WORKSPACE_MAX_AGE = int(os.getenv("AUDIO_WORKSPACE_MAX_AGE", str(6 * 60 * 60)))
+AUDIO_WORKSPACE_JANITOR_INTERVAL = int(os.getenv("AUDIO_WORKSPACE_JANITOR_INTERVAL", "300"))
+
+
+# Transcription
+# Audio above the inline upload limit is split into overlapping windows transcribed in parallel.
+TRANSCRIPTION_CHUNKING = os.getenv("TRANSCRIPTION_CHUNKING", "True") == "True"
+TRANSCRIPTION_CHUNK_SECONDS = int(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "600"))
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = int(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", "10"))
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv("TRANSCRIPTION_MAX_WORKERS", "4"))
+# "gemini" (remote API) or "whisper" (local faster-whisper on CPU, needs `pip install faster-whisper`).
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "gemini")
+# Local requests from concurrent jobs are collected for up to BATCH_WAIT seconds and run together.
+TRANSCRIPTION_BATCH_SIZE = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", "4"))
+TRANSCRIPTION_BATCH_WAIT = float(os.getenv("TRANSCRIPTION_BATCH_WAIT", "0.5"))
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+WHISPER_MODEL_DIR = os.getenv("WHISPER_MODEL_DIR")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0: CTranslate2 default
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))
+# 30s windows decoded per forward pass. Jobs are only batched together when the language is fixed.
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE") or None
+# One Gemini call from audio straight to questions for uncached videos whose audio is at most
+# QUIZ_ONE_SHOT_MAX_BYTES (capped at the 20 MB inline limit). No transcript is stored for reuse.
+QUIZ_ONE_SHOT = os.getenv("QUIZ_ONE_SHOT", "False") == "True"
+QUIZ_ONE_SHOT_MAX_BYTES = int(os.getenv("QUIZ_ONE_SHOT_MAX_BYTES", str(10 * 1024 ** 2)))
+
+# Threads for the blocking yt-dlp/ffmpeg steps of the async (ASGI) pipeline.
+AUDIO_EXECUTOR_WORKERS = int(os.getenv("AUDIO_EXECUTOR_WORKERS", "4"))
+
+
+# Backpressure
+# Concurrent pipeline stages per host, shared by all processes through lock files in STAGE_LOCK_DIR.
+STAGE_CONCURRENCY = {
+    "download": int(os.getenv("DOWNLOAD_CONCURRENCY", "2")),
+    "gemini": int(os.getenv("GEMINI_CONCURRENCY", "4")),
+}
+STAGE_LOCK_DIR = os.getenv("STAGE_LOCK_DIR")  # default: <tmp>/quizly-locks
+STAGE_WAIT_TIMEOUT = int(os.getenv("STAGE_WAIT_TIMEOUT", "300"))
+# Token bucket for Gemini requests across processes; 0 disables it.
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "10"))
+# New pipelines are refused with 429 once this many are pending or running; 0 disables it.
+QUIZ_QUEUE_MAX_ACTIVE = int(os.getenv("QUIZ_QUEUE_MAX_ACTIVE", "50"))
+QUIZ_QUEUE_RETRY_AFTER = int(os.getenv("QUIZ_QUEUE_RETRY_AFTER", "30"))
+
+# Gemini retries: jittered exponential backoff, per-attempt timeout and overall deadline (seconds).
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", "3"))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "1"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "20"))
+GEMINI_ATTEMPT_TIMEOUT = float(os.getenv("GEMINI_ATTEMPT_TIMEOUT", "120"))
+GEMINI_CALL_DEADLINE = float(os.getenv("GEMINI_CALL_DEADLINE", "300"))
+# Hedging sends a duplicate request once a call is slower than the observed p95
+# (GEMINI_HEDGE_AFTER until enough calls were seen). Costs extra quota.
+GEMINI_HEDGING = os.getenv("GEMINI_HEDGING", "False") == "True"
+GEMINI_HEDGE_AFTER = float(os.getenv("GEMINI_HEDGE_AFTER", "30"))
+
+
+# Verified access tokens -> users, kept per process for at most AUTH_USER_CACHE_TTL seconds.
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+# Build request.user from the access token's claims instead of loading the row.
+# Claims are only as fresh as the token: deactivation takes effect once it expires.
+AUTH_STATELESS_TOKENS = os.getenv("AUTH_STATELESS_TOKENS", "False") == "True"
+
+# Per-process bloom filter in front of the refresh token blacklist.
+# Blacklistings from other processes are seen after at most one sync interval; 0 disables the filter.
+BLACKLIST_FILTER_SYNC_INTERVAL = float(os.getenv("BLACKLIST_FILTER_SYNC_INTERVAL", "5"))
+BLACKLIST_FILTER_CAPACITY = int(os.getenv("BLACKLIST_FILTER_CAPACITY", "100000"))
+BLACKLIST_FILTER_ERROR_RATE = float(os.getenv("BLACKLIST_FILTER_ERROR_RATE", "0.001"))
+
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
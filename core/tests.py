@@ -0,0 +1,15 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_sqlite_connections_get_configured_pragmas(settings):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA busy_timeout")
+        busy_timeout = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+
+    assert busy_timeout == settings.SQLITE_PRAGMAS["busy_timeout"]
+    # 1 is NORMAL
+    assert synchronous == 1
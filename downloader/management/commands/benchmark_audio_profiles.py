@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from downloader.services import AUDIO_ENCODE_PROFILES, prepare_audio_for_transcription
+from quizly_app.utils import INLINE_UPLOAD_LIMIT, transcribe_audio_with_gemini
+
+
+class Command(BaseCommand):
+    help = "Report upload size and latency of each audio encode profile on sample audio."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio_files", nargs="+", help="Sample audio files (webm, m4a, mp3, ...).")
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=list(AUDIO_ENCODE_PROFILES),
+            help="Profiles to compare (default: all).",
+        )
+        parser.add_argument(
+            "--transcribe",
+            action="store_true",
+            help="Also transcribe each output with Gemini to measure end-to-end latency.",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["profiles"]) - set(AUDIO_ENCODE_PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        header = f"{'file':<28} {'profile':<18} {'size KB':>10} {'upload':>9} {'encode s':>9} {'transcribe s':>13} {'total s':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for audio_file in options["audio_files"]:
+            if not os.path.isfile(audio_file):
+                raise CommandError(f"File not found: {audio_file}")
+
+            for profile_name in options["profiles"]:
+                self.stdout.write(self.run_profile(audio_file, profile_name, options["transcribe"]))
+
+    def run_profile(self, audio_file: str, profile_name: str, transcribe: bool) -> str:
+        with tempfile.TemporaryDirectory() as work_dir:
+            source = shutil.copy(audio_file, work_dir)
+
+            started = time.perf_counter()
+            output_path, _ = prepare_audio_for_transcription(source, profile_name)
+            encode_seconds = time.perf_counter() - started
+
+            size = os.path.getsize(output_path)
+            upload = "inline" if size <= INLINE_UPLOAD_LIMIT else "files-api"
+
+            transcribe_seconds = 0.0
+            if transcribe:
+                started = time.perf_counter()
+                transcribe_audio_with_gemini(output_path)
+                transcribe_seconds = time.perf_counter() - started
+
+        transcribe_column = f"{transcribe_seconds:.2f}" if transcribe else "-"
+        return (
+            f"{os.path.basename(audio_file)[:28]:<28} {profile_name:<18} {size / 1024:>10.1f} "
+            f"{upload:>9} {encode_seconds:>9.2f} {transcribe_column:>13} "
+            f"{encode_seconds + transcribe_seconds:>8.2f}"
+        )
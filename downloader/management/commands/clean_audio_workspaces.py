@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from downloader.workspace import get_workspace_root, reap_orphaned_workspaces
+
+
+class Command(BaseCommand):
+    help = "Remove audio workspaces left behind by crashed workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=None,
+            help="Also remove workspaces older than this many seconds (default: AUDIO_WORKSPACE_MAX_AGE).",
+        )
+
+    def handle(self, *args, **options):
+        root = get_workspace_root()
+        removed = reap_orphaned_workspaces(root, options["max_age"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} workspace(s) from {root}."))
@@ -1,19 +1,157 @@
+import json
 import os
+import sys
 import tempfile
 import subprocess
+from django.conf import settings
+
+
+MP3_ENCODE_ARGS = ["-vn", "-acodec", "libmp3lame", "-ac", "1", "-ab", "128k"]
+
+# Encode profiles selectable with the AUDIO_ENCODE_PROFILE setting.
+# "passthrough" keeps supported codecs and only transcodes the rest to mp3_128k.
+AUDIO_ENCODE_PROFILES = {
+    "passthrough": None,
+    "mp3_128k": {
+        "args": MP3_ENCODE_ARGS,
+        "muxer": "mp3",
+        "ext": ".mp3",
+        "mime_type": "audio/mpeg",
+    },
+    "speech_mp3_32k": {
+        "args": ["-vn", "-c:a", "libmp3lame", "-ac", "1", "-ar", "16000", "-b:a", "32k"],
+        "muxer": "mp3",
+        "ext": ".mp3",
+        "mime_type": "audio/mpeg",
+    },
+    "speech_opus_32k": {
+        "args": ["-vn", "-c:a", "libopus", "-ac", "1", "-ar", "16000", "-b:a", "32k", "-application", "voip"],
+        "muxer": "ogg",
+        "ext": ".ogg",
+        "mime_type": "audio/ogg",
+    },
+    "speech_opus_24k": {
+        "args": ["-vn", "-c:a", "libopus", "-ac", "1", "-ar", "16000", "-b:a", "24k", "-application", "voip"],
+        "muxer": "ogg",
+        "ext": ".ogg",
+        "mime_type": "audio/ogg",
+    },
+}
+
+# Codecs the transcriber accepts as-is, mapped to the container they must be in:
+# codec -> (ffmpeg muxer, ffprobe format name, file extension, mime type)
+PASSTHROUGH_CODECS = {
+    "mp3": ("mp3", "mp3", ".mp3", "audio/mpeg"),
+    "aac": ("adts", "aac", ".aac", "audio/aac"),
+    "opus": ("ogg", "ogg", ".ogg", "audio/ogg"),
+    "vorbis": ("ogg", "ogg", ".ogg", "audio/ogg"),
+    "flac": ("flac", "flac", ".flac", "audio/flac"),
+    "pcm_s16le": ("wav", "wav", ".wav", "audio/wav"),
+}
+
+# yt-dlp reports codecs like "mp4a.40.2"; map their prefixes to ffprobe names.
+YT_DLP_CODEC_PREFIXES = {
+    "mp4a": "aac",
+    "opus": "opus",
+    "vorbis": "vorbis",
+    "mp3": "mp3",
+    "flac": "flac",
+}
+
+MIME_TYPES = {ext: mime for _, _, ext, mime in PASSTHROUGH_CODECS.values()}
+
+
+def mime_type_for_path(path: str) -> str:
+    """
+    Return the transcription mime type for an audio file produced by this module.
+    """
+    return MIME_TYPES.get(os.path.splitext(path)[1].lower(), "audio/mpeg")
+
+
+def get_encode_profile_name(profile_name: str | None = None) -> str:
+    """
+    Return the requested profile name, defaulting to AUDIO_ENCODE_PROFILE.
+    """
+    profile_name = profile_name or getattr(settings, "AUDIO_ENCODE_PROFILE", "passthrough")
+    if profile_name not in AUDIO_ENCODE_PROFILES:
+        raise ValueError(f"Unknown audio encode profile: {profile_name}")
+    return profile_name
+
+
+def _output_path(input_path: str, ext: str, tag: str) -> str:
+    base = os.path.splitext(input_path)[0]
+    output_path = base + ext
+    if output_path == input_path:
+        output_path = f"{base}.{tag}{ext}"
+    return output_path
+
+
+def encode_audio(input_path: str, profile_name: str, output_path: str | None = None) -> str:
+    """
+    Re-encode an audio file with one of the AUDIO_ENCODE_PROFILES.
+    """
+    profile = AUDIO_ENCODE_PROFILES[profile_name]
+    output_path = output_path or _output_path(input_path, profile["ext"], profile_name)
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i", input_path,
+        *profile["args"],
+        "-f", profile["muxer"],
+        output_path,
+    ]
+
+    result = subprocess.run(cmd, capture_output=True)
+
+    if result.returncode != 0 or not os.path.exists(output_path):
+        stderr = result.stderr.decode("utf-8", errors="replace")
+        raise RuntimeError(f"FFmpeg conversion failed: {stderr}")
+
+    return output_path
 
 
 def convert_to_mp3(input_path: str) -> str:
-    output_path = os.path.splitext(input_path)[0] + ".mp3"
+    return encode_audio(input_path, "mp3_128k")
+
+
+def probe_audio_codec(input_path: str) -> tuple[str | None, str]:
+    """
+    Return (audio codec name, container format name) using ffprobe.
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name:format=format_name",
+        "-of", "json",
+        input_path,
+    ]
+
+    result = subprocess.run(cmd, capture_output=True)
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace")
+        raise RuntimeError(f"FFprobe failed: {stderr}")
+
+    probe = json.loads(result.stdout.decode("utf-8") or "{}")
+    streams = probe.get("streams") or [{}]
+    return streams[0].get("codec_name"), probe.get("format", {}).get("format_name", "")
+
+
+def remux_audio(input_path: str, muxer: str, ext: str) -> str:
+    """
+    Copy the audio stream into another container without re-encoding.
+    """
+    output_path = _output_path(input_path, ext, "remux")
 
     cmd = [
         "ffmpeg",
         "-y",
         "-i", input_path,
         "-vn",
-        "-acodec", "libmp3lame",
-        "-ac", "1",
-        "-ab", "128k",
+        "-c:a", "copy",
+        "-f", muxer,
         output_path,
     ]
 
@@ -21,12 +159,135 @@ def convert_to_mp3(input_path: str) -> str:
 
     if result.returncode != 0 or not os.path.exists(output_path):
         stderr = result.stderr.decode("utf-8", errors="replace")
-        raise RuntimeError(f"FFmpeg conversion failed: {stderr}")
+        raise RuntimeError(f"FFmpeg remux failed: {stderr}")
 
     return output_path
 
 
-def download_youtube_audio(url: str) -> tuple[str, str]:
+def prepare_audio_for_transcription(input_path: str, profile_name: str | None = None) -> tuple[str, str]:
+    """
+    Negotiate the cheapest way to hand a file to the transcriber.
+    With the "passthrough" profile, supported codecs in the right container
+    pass through untouched, supported codecs in another container (e.g. opus
+    in webm, aac in m4a) are remuxed losslessly, and anything else is
+    transcoded to mp3. Other profiles always encode with their settings.
+    Returns (path, mime_type).
+    """
+    profile_name = get_encode_profile_name(profile_name)
+    if profile_name != "passthrough":
+        return encode_audio(input_path, profile_name), AUDIO_ENCODE_PROFILES[profile_name]["mime_type"]
+
+    codec, format_name = probe_audio_codec(input_path)
+    target = PASSTHROUGH_CODECS.get(codec)
+
+    if target is None:
+        return convert_to_mp3(input_path), "audio/mpeg"
+
+    muxer, probed_format, ext, mime_type = target
+    if probed_format in format_name.split(","):
+        return input_path, mime_type
+
+    try:
+        return remux_audio(input_path, muxer, ext), mime_type
+    except RuntimeError:
+        return convert_to_mp3(input_path), "audio/mpeg"
+
+
+def negotiate_stream_output(acodec: str | None, profile_name: str | None = None) -> tuple[list[str], str]:
+    """
+    Pick ffmpeg output args for the streaming path. With the "passthrough"
+    profile the codec yt-dlp reported is copied when supported, otherwise
+    mp3 is used; other profiles always encode with their settings.
+    Returns (ffmpeg_output_args, mime_type).
+    """
+    profile_name = get_encode_profile_name(profile_name)
+    if profile_name != "passthrough":
+        profile = AUDIO_ENCODE_PROFILES[profile_name]
+        return [*profile["args"], "-f", profile["muxer"]], profile["mime_type"]
+
+    codec = None
+    for prefix, name in YT_DLP_CODEC_PREFIXES.items():
+        if (acodec or "").lower().startswith(prefix):
+            codec = name
+            break
+
+    if codec in PASSTHROUGH_CODECS:
+        muxer, _, _, mime_type = PASSTHROUGH_CODECS[codec]
+        return ["-vn", "-c:a", "copy", "-f", muxer], mime_type
+
+    return [*MP3_ENCODE_ARGS, "-f", "mp3"], "audio/mpeg"
+
+
+def probe_duration(input_path: str) -> float:
+    """
+    Return the duration of a media file in seconds using ffprobe.
+    """
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        input_path,
+    ]
+
+    result = subprocess.run(cmd, capture_output=True)
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace")
+        raise RuntimeError(f"FFprobe failed: {stderr}")
+
+    try:
+        return float(result.stdout.decode("utf-8").strip())
+    except ValueError as exc:
+        raise RuntimeError("FFprobe returned no duration.") from exc
+
+
+def split_audio(input_path: str, window_seconds: float, overlap_seconds: float) -> list[str]:
+    """
+    Cut an audio file into overlapping windows next to the input file.
+    Streams are copied, so this is cheap compared to a transcode.
+    """
+    if overlap_seconds >= window_seconds:
+        raise ValueError("Overlap must be shorter than the window.")
+
+    duration = probe_duration(input_path)
+    base, ext = os.path.splitext(input_path)
+    step = window_seconds - overlap_seconds
+
+    chunk_paths = []
+    start = 0.0
+    index = 0
+
+    while start < duration:
+        chunk_path = f"{base}.part{index:03d}{ext}"
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-ss", f"{start:.3f}",
+            "-t", f"{window_seconds:.3f}",
+            "-i", input_path,
+            "-vn",
+            "-c", "copy",
+            chunk_path,
+        ]
+
+        result = subprocess.run(cmd, capture_output=True)
+
+        if result.returncode != 0 or not os.path.exists(chunk_path):
+            stderr = result.stderr.decode("utf-8", errors="replace")
+            raise RuntimeError(f"FFmpeg split failed: {stderr}")
+
+        chunk_paths.append(chunk_path)
+
+        if start + window_seconds >= duration:
+            break
+        start += step
+        index += 1
+
+    return chunk_paths
+
+
+def _import_yt_dlp():
     try:
         import yt_dlp
     except ImportError as exc:
@@ -34,7 +295,110 @@ def download_youtube_audio(url: str) -> tuple[str, str]:
             "yt-dlp is not installed. Install it to use YouTube download features."
         ) from exc
 
-    temp_dir = tempfile.mkdtemp()
+    return yt_dlp
+
+
+class StreamTooLarge(RuntimeError):
+    """Raised when streamed audio would exceed `max_bytes`; use the file download instead."""
+
+
+STREAM_READ_SIZE = 1024 * 1024
+
+
+def stream_youtube_audio(url: str, max_bytes: int | None = None) -> tuple[bytes, str, str]:
+    """
+    Download and transcode without temp files: yt-dlp writes the audio stream
+    to stdout, ffmpeg reads it from stdin and writes to stdout. Supported
+    codecs are only remuxed; others are transcoded to mp3. The subprocess
+    reuses the metadata extracted here instead of extracting it again.
+    Audio over `max_bytes` raises StreamTooLarge, up front when the copied
+    stream's size is known, otherwise as soon as the output passes it.
+    Returns (audio_bytes, title, mime_type).
+    """
+    yt_dlp = _import_yt_dlp()
+
+    with yt_dlp.YoutubeDL({"format": "bestaudio/best", "quiet": True, "no_warnings": True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+        info_json = json.dumps(ydl.sanitize_info(info))
+
+    title = info.get("title", "YouTube Audio")
+    output_args, mime_type = negotiate_stream_output(info.get("acodec"))
+
+    source_size = info.get("filesize") or info.get("filesize_approx") or 0
+    if max_bytes and "copy" in output_args and source_size > max_bytes:
+        raise StreamTooLarge(f"Audio stream is {source_size} bytes, over the {max_bytes} byte limit.")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".info.json", delete=False) as info_file:
+        info_file.write(info_json)
+
+    download_cmd = [
+        sys.executable, "-m", "yt_dlp",
+        "--quiet",
+        "--no-warnings",
+        "--js-runtimes", "node",
+        "--remote-components", "ejs:github",
+        "--load-info-json", info_file.name,
+        "-f", info.get("format_id") or "bestaudio/best",
+        "-o", "-",
+    ]
+    encode_cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-i", "pipe:0",
+        *output_args,
+        "pipe:1",
+    ]
+
+    try:
+        with tempfile.TemporaryFile() as encoder_log:
+            downloader = subprocess.Popen(download_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            encoder = subprocess.Popen(encode_cmd, stdin=downloader.stdout, stdout=subprocess.PIPE, stderr=encoder_log)
+            downloader.stdout.close()
+
+            try:
+                audio_bytes = _read_limited(encoder.stdout, max_bytes)
+            except BaseException:
+                encoder.kill()
+                downloader.kill()
+                raise
+            finally:
+                encoder.stdout.close()
+
+            encoder_returncode = encoder.wait()
+            download_returncode = downloader.wait()
+
+            encoder_log.seek(0)
+            stderr = encoder_log.read()
+    finally:
+        os.remove(info_file.name)
+
+    if download_returncode != 0:
+        raise RuntimeError(f"yt-dlp streaming exited with code {download_returncode}")
+
+    if encoder_returncode != 0 or not audio_bytes:
+        raise RuntimeError(f"FFmpeg conversion failed: {stderr.decode('utf-8', errors='replace')}")
+
+    return audio_bytes, title, mime_type
+
+
+def _read_limited(stream, max_bytes: int | None) -> bytes:
+    chunks, size = [], 0
+    while chunk := stream.read(STREAM_READ_SIZE):
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise StreamTooLarge(f"Audio stream is over the {max_bytes} byte limit.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def download_youtube_audio(url: str, output_dir: str | None = None) -> tuple[str, str]:
+    """
+    Download the best audio stream into `output_dir` (normally a workspace
+    from `downloader.workspace.audio_workspace`) and prepare it for upload.
+    """
+    yt_dlp = _import_yt_dlp()
+
+    temp_dir = output_dir or tempfile.mkdtemp()
     output_path = os.path.join(temp_dir, "%(title)s.%(ext)s")
 
     ydl_opts = {
@@ -59,5 +423,5 @@ def download_youtube_audio(url: str) -> tuple[str, str]:
     if not downloaded_file:
         raise RuntimeError("No downloaded audio file found.")
 
-    mp3_path = convert_to_mp3(downloaded_file)
-    return mp3_path, title
\ No newline at end of file
+    audio_path, _ = prepare_audio_for_transcription(downloaded_file)
+    return audio_path, title
\ No newline at end of file
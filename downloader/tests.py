@@ -1,3 +1,192 @@
-from django.test import TestCase
+import io
+import json
+import os
+import socket
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from downloader import services
+from downloader.workspace import WorkspaceQuotaExceeded, audio_workspace, reap_orphaned_workspaces
+from downloader.services import (
+    mime_type_for_path,
+    negotiate_stream_output,
+    prepare_audio_for_transcription,
+)
 
-# Create your tests here.
+
+class TestCodecNegotiation:
+
+    @patch("downloader.services.convert_to_mp3")
+    @patch("downloader.services.remux_audio")
+    @patch("downloader.services.probe_audio_codec", return_value=("mp3", "mp3"))
+    def test_supported_codec_passes_through(self, mock_probe, mock_remux, mock_convert):
+        assert prepare_audio_for_transcription("/tmp/a.mp3") == ("/tmp/a.mp3", "audio/mpeg")
+        mock_remux.assert_not_called()
+        mock_convert.assert_not_called()
+
+    @patch("downloader.services.convert_to_mp3")
+    @patch("downloader.services.remux_audio", return_value="/tmp/a.ogg")
+    @patch("downloader.services.probe_audio_codec", return_value=("opus", "matroska,webm"))
+    def test_opus_in_webm_is_remuxed(self, mock_probe, mock_remux, mock_convert):
+        assert prepare_audio_for_transcription("/tmp/a.webm") == ("/tmp/a.ogg", "audio/ogg")
+        mock_remux.assert_called_once_with("/tmp/a.webm", "ogg", ".ogg")
+        mock_convert.assert_not_called()
+
+    @patch("downloader.services.remux_audio", return_value="/tmp/a.aac")
+    @patch("downloader.services.probe_audio_codec", return_value=("aac", "mov,mp4,m4a,3gp,3g2,mj2"))
+    def test_aac_in_m4a_is_remuxed_to_adts(self, mock_probe, mock_remux):
+        assert prepare_audio_for_transcription("/tmp/a.m4a") == ("/tmp/a.aac", "audio/aac")
+        mock_remux.assert_called_once_with("/tmp/a.m4a", "adts", ".aac")
+
+    @patch("downloader.services.convert_to_mp3", return_value="/tmp/a.mp3")
+    @patch("downloader.services.probe_audio_codec", return_value=("alac", "mov,mp4,m4a,3gp,3g2,mj2"))
+    def test_unsupported_codec_is_transcoded(self, mock_probe, mock_convert):
+        assert prepare_audio_for_transcription("/tmp/a.m4a") == ("/tmp/a.mp3", "audio/mpeg")
+
+    @patch("downloader.services.convert_to_mp3", return_value="/tmp/a.mp3")
+    @patch("downloader.services.remux_audio", side_effect=RuntimeError("bad stream"))
+    @patch("downloader.services.probe_audio_codec", return_value=("opus", "matroska,webm"))
+    def test_failed_remux_falls_back_to_transcode(self, mock_probe, mock_remux, mock_convert):
+        assert prepare_audio_for_transcription("/tmp/a.webm") == ("/tmp/a.mp3", "audio/mpeg")
+
+    def test_stream_output_copies_supported_codecs(self):
+        assert negotiate_stream_output("opus") == (["-vn", "-c:a", "copy", "-f", "ogg"], "audio/ogg")
+        assert negotiate_stream_output("mp4a.40.2") == (["-vn", "-c:a", "copy", "-f", "adts"], "audio/aac")
+
+    def test_stream_output_transcodes_unknown_codecs(self):
+        args, mime_type = negotiate_stream_output("ac-3")
+        assert args == [*services.MP3_ENCODE_ARGS, "-f", "mp3"]
+        assert mime_type == "audio/mpeg"
+
+    def test_mime_type_for_path(self):
+        assert mime_type_for_path("/tmp/x.ogg") == "audio/ogg"
+        assert mime_type_for_path("/tmp/x.AAC") == "audio/aac"
+        assert mime_type_for_path("/tmp/x.mp3") == "audio/mpeg"
+
+
+class TestEncodeProfiles:
+
+    @patch("downloader.services.encode_audio", return_value="/tmp/a.ogg")
+    @patch("downloader.services.probe_audio_codec")
+    def test_speech_profile_always_encodes(self, mock_probe, mock_encode, settings):
+        settings.AUDIO_ENCODE_PROFILE = "speech_opus_24k"
+
+        assert prepare_audio_for_transcription("/tmp/a.mp3") == ("/tmp/a.ogg", "audio/ogg")
+        mock_encode.assert_called_once_with("/tmp/a.mp3", "speech_opus_24k")
+        mock_probe.assert_not_called()
+
+    def test_stream_output_uses_selected_profile(self, settings):
+        settings.AUDIO_ENCODE_PROFILE = "speech_opus_24k"
+
+        args, mime_type = negotiate_stream_output("opus")
+
+        assert args[-2:] == ["-f", "ogg"]
+        assert "libopus" in args and "16000" in args and "24k" in args
+        assert mime_type == "audio/ogg"
+
+    def test_unknown_profile_is_rejected(self, settings):
+        settings.AUDIO_ENCODE_PROFILE = "lossless_9000"
+
+        with pytest.raises(ValueError):
+            negotiate_stream_output("opus")
+
+    @patch("downloader.services.subprocess.run")
+    def test_encode_never_overwrites_its_input(self, mock_run, tmp_path):
+        source = tmp_path / "talk.mp3"
+        source.write_bytes(b"mp3")
+        (tmp_path / "talk.speech_mp3_32k.mp3").write_bytes(b"encoded")
+        mock_run.return_value.returncode = 0
+
+        output = services.encode_audio(str(source), "speech_mp3_32k")
+
+        assert output == str(tmp_path / "talk.speech_mp3_32k.mp3")
+
+
+class TestAudioWorkspace:
+
+    @pytest.fixture
+    def root(self, tmp_path, settings):
+        settings.AUDIO_WORKSPACE_ROOT = str(tmp_path / "workspaces")
+        settings.AUDIO_WORKSPACE_QUOTA_BYTES = 0
+        return tmp_path / "workspaces"
+
+    def test_workspace_removed_after_success(self, root):
+        with audio_workspace() as path:
+            (Path(path) / "audio.webm").write_bytes(b"data")
+
+        assert not Path(path).exists()
+
+    def test_workspace_removed_after_failure(self, root):
+        with pytest.raises(RuntimeError):
+            with audio_workspace() as path:
+                raise RuntimeError("ffmpeg crashed")
+
+        assert not Path(path).exists()
+
+    def test_janitor_reaps_workspaces_of_dead_processes(self, root):
+        root.mkdir()
+        orphan = root / "job-orphan"
+        orphan.mkdir()
+        (orphan / ".owner").write_text(json.dumps({"pid": 2 ** 22 + 1, "host": socket.gethostname()}))
+        alive = root / "job-alive"
+        alive.mkdir()
+        (alive / ".owner").write_text(json.dumps({"pid": os.getpid(), "host": socket.gethostname()}))
+
+        assert reap_orphaned_workspaces(root, max_age=3600) == 1
+        assert not orphan.exists()
+        assert alive.exists()
+
+    def test_old_workspace_of_live_local_process_is_kept(self, root):
+        root.mkdir()
+        long_job = root / "job-long"
+        long_job.mkdir()
+        (long_job / ".owner").write_text(json.dumps({"pid": os.getpid(), "host": socket.gethostname()}))
+        os.utime(long_job, (0, 0))
+
+        assert reap_orphaned_workspaces(root, max_age=3600) == 0
+        assert long_job.exists()
+
+    def test_quota_backpressure_gives_up(self, root, settings):
+        settings.AUDIO_WORKSPACE_QUOTA_BYTES = 10
+        settings.AUDIO_WORKSPACE_QUOTA_WAIT = 0
+        busy = root / "job-busy"
+        busy.mkdir(parents=True)
+        (busy / ".owner").write_text(json.dumps({"pid": os.getpid(), "host": socket.gethostname()}))
+        (busy / "audio.webm").write_bytes(b"x" * 100)
+
+        with pytest.raises(WorkspaceQuotaExceeded):
+            with audio_workspace():
+                pass
+
+
+class TestStreamingLimit:
+
+    class FakeYoutubeDL:
+        def __init__(self, options):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {"title": "Long", "acodec": "opus", "filesize": 50 * 1024 ** 2, "format_id": "251"}
+
+        def sanitize_info(self, info):
+            return info
+
+    def test_large_copied_stream_is_refused_before_downloading(self, monkeypatch):
+        monkeypatch.setattr(services, "_import_yt_dlp", lambda: type("yt", (), {"YoutubeDL": self.FakeYoutubeDL}))
+
+        with patch("downloader.services.subprocess.Popen") as mock_popen:
+            with pytest.raises(services.StreamTooLarge):
+                services.stream_youtube_audio("https://youtu.be/x", max_bytes=20 * 1024 ** 2)
+
+        mock_popen.assert_not_called()
+
+    def test_output_is_read_up_to_the_limit(self):
+        assert services._read_limited(io.BytesIO(b"x" * 10), max_bytes=10) == b"x" * 10
+        with pytest.raises(services.StreamTooLarge):
+            services._read_limited(io.BytesIO(b"x" * 11), max_bytes=10)
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+
+
+OWNER_FILE = ".owner"
+
+_janitor_lock = threading.Lock()
+_last_janitor_run = 0.0
+
+
+class WorkspaceQuotaExceeded(ValueError):
+    """
+    Raised when the workspace root stays over quota for too long. A ValueError,
+    like the pipeline's other backpressure errors, so jobs report its message.
+    """
+
+
+def get_workspace_root() -> Path:
+    root = getattr(settings, "AUDIO_WORKSPACE_ROOT", None) or Path(tempfile.gettempdir()) / "quizly-audio"
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def directory_size(path: Path) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                continue
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_owner(workspace: Path) -> dict:
+    try:
+        return json.loads((workspace / OWNER_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def is_orphaned(workspace: Path, max_age: float) -> bool:
+    """
+    A workspace owned by a process on this host is orphaned only when that
+    process is gone, however long it has been running. When the owner is on
+    another host or unknown, it is orphaned after `max_age` seconds.
+    """
+    owner = _read_owner(workspace)
+
+    if owner.get("host") == socket.gethostname() and owner.get("pid"):
+        return not _pid_alive(owner["pid"])
+
+    try:
+        age = time.time() - workspace.stat().st_mtime
+    except OSError:
+        return False
+    return age > max_age
+
+
+def reap_orphaned_workspaces(root: Path | None = None, max_age: float | None = None) -> int:
+    """
+    Delete workspaces left behind by crashed workers. Returns how many were removed.
+    """
+    root = root or get_workspace_root()
+    if max_age is None:
+        max_age = getattr(settings, "AUDIO_WORKSPACE_MAX_AGE", 6 * 60 * 60)
+
+    removed = 0
+    for workspace in root.iterdir():
+        if workspace.is_dir() and is_orphaned(workspace, max_age):
+            shutil.rmtree(workspace, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def maybe_reap_orphaned_workspaces(root: Path):
+    """
+    Run the janitor at most once per AUDIO_WORKSPACE_JANITOR_INTERVAL seconds.
+    """
+    global _last_janitor_run
+
+    interval = getattr(settings, "AUDIO_WORKSPACE_JANITOR_INTERVAL", 300)
+    with _janitor_lock:
+        if time.monotonic() - _last_janitor_run < interval:
+            return
+        _last_janitor_run = time.monotonic()
+
+    reap_orphaned_workspaces(root)
+
+
+def wait_for_disk_quota(root: Path):
+    """
+    Block while the workspace root is over AUDIO_WORKSPACE_QUOTA_BYTES,
+    reclaiming orphans first, and give up after AUDIO_WORKSPACE_QUOTA_WAIT seconds.
+    The quota covers the whole root, i.e. all workers sharing it, not one job.
+    """
+    quota = getattr(settings, "AUDIO_WORKSPACE_QUOTA_BYTES", 0)
+    if not quota:
+        return
+
+    deadline = time.monotonic() + getattr(settings, "AUDIO_WORKSPACE_QUOTA_WAIT", 60)
+    reaped = False
+
+    while directory_size(root) >= quota:
+        if not reaped:
+            reap_orphaned_workspaces(root)
+            reaped = True
+            continue
+        if time.monotonic() >= deadline:
+            raise WorkspaceQuotaExceeded("Audio workspace disk quota exceeded, try again later.")
+        time.sleep(0.5)
+
+
+@contextmanager
+def audio_workspace():
+    """
+    Create a scratch directory for one pipeline run and always delete it,
+    whether the run succeeds or fails.
+    """
+    root = get_workspace_root()
+    maybe_reap_orphaned_workspaces(root)
+    wait_for_disk_quota(root)
+
+    path = Path(tempfile.mkdtemp(prefix="job-", dir=root))
+    (path / OWNER_FILE).write_text(json.dumps({
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+        "created": time.time(),
+    }))
+
+    try:
+        yield str(path)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
@@ -1,8 +1,22 @@
 from django.contrib import admin
-from .models import Quiz  
+from .models import Quiz, QuizJob, Transcript
 
 @admin.register(Quiz)
 class QuizletAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "user", "created_at") 
     list_filter = ("user",)
-    search_fields = ("title", "user__email")
\ No newline at end of file
+    search_fields = ("title", "user__email")
+
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "video_url", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("video_url", "user__email")
+
+
+
+@admin.register(Transcript)
+class TranscriptAdmin(admin.ModelAdmin):
+    list_display = ("id", "video_id", "title", "created_at")
+    search_fields = ("video_id", "title", "audio_checksum")
@@ -1,5 +1,28 @@
+import os
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
 
 class QuizlyAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quizly_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "GEMINI_WARMUP", False):
+            from . import utils  # noqa: F401  (registers the client's fork reset before ours)
+
+            start_gemini_warmup()
+            # With a preloading server the app is loaded before the workers fork;
+            # each worker then needs its own connection.
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=start_gemini_warmup)
+
+
+def start_gemini_warmup():
+    from .utils import warm_up_gemini_client
+
+    threading.Thread(target=warm_up_gemini_client, name="gemini-warmup", daemon=True).start()
@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from downloader.services import mime_type_for_path, split_audio
+from downloader.workspace import audio_workspace
+from .limits import StageBusy, agemini_call_slot, astage_limit
+from .retry import acall_with_retry
+from .transcription import get_transcription_backend
+from .utils import (
+    GEMINI_MODEL,
+    INLINE_UPLOAD_LIMIT,
+    build_audio_question_prompt,
+    build_question_config,
+    build_question_prompt,
+    build_question_schema,
+    build_transcription_prompt,
+    download_audio_from_youtube,
+    extract_youtube_video_id,
+    file_checksum,
+    get_cached_transcript,
+    get_async_gemini_client,
+    get_genai_types,
+    merge_overlapping_transcripts,
+    one_shot_audio_bytes,
+    one_shot_enabled,
+    questions_from_response,
+    store_transcript,
+    stream_audio_from_youtube,
+    transcript_from_response,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    Shared pool for the blocking yt-dlp / ffmpeg / file steps of async pipelines,
+    sized by AUDIO_EXECUTOR_WORKERS. Gemini calls never occupy it.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "AUDIO_EXECUTOR_WORKERS", 4),
+            thread_name_prefix="quiz-audio",
+        )
+    return _executor
+
+
+async def run_blocking(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), partial(func, *args))
+
+
+@asynccontextmanager
+async def async_audio_workspace():
+    """
+    `audio_workspace` entered and left on the blocking executor
+    (it may wait for disk quota and deletes files on exit).
+    """
+    manager = audio_workspace()
+    path = await run_blocking(manager.__enter__)
+    try:
+        yield path
+    finally:
+        await run_blocking(manager.__exit__, None, None, None)
+
+
+async def arequest_transcript(client, audio) -> str:
+    async def attempt():
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[build_transcription_prompt(), audio],
+        )
+        return transcript_from_response(response)
+
+    return await acall_with_retry(attempt, "transcription")
+
+
+async def atranscribe_audio_bytes(audio_bytes: bytes, mime_type: str = "audio/mpeg", client=None) -> str:
+    client = client or get_async_gemini_client()
+
+    if len(audio_bytes) > INLINE_UPLOAD_LIMIT:
+        async with agemini_call_slot():
+            uploaded_file = await client.aio.files.upload(
+                file=io.BytesIO(audio_bytes),
+                config={"mime_type": mime_type},
+            )
+        return await arequest_transcript(client, uploaded_file)
+
+    types = get_genai_types()
+    return await arequest_transcript(client, types.Part.from_bytes(data=audio_bytes, mime_type=mime_type))
+
+
+async def atranscribe_audio_part(audio_path: str, client) -> str:
+    if os.path.getsize(audio_path) > INLINE_UPLOAD_LIMIT:
+        async with agemini_call_slot():
+            uploaded_file = await client.aio.files.upload(
+                file=audio_path,
+                config={"mime_type": mime_type_for_path(audio_path)},
+            )
+        return await arequest_transcript(client, uploaded_file)
+
+    audio_bytes = await run_blocking(Path(audio_path).read_bytes)
+    return await atranscribe_audio_bytes(audio_bytes, mime_type_for_path(audio_path), client)
+
+
+async def atranscribe_audio_with_gemini(audio_path: str, client=None) -> str:
+    """
+    Async counterpart of `transcribe_audio_with_gemini`: chunks are split on
+    the blocking executor and transcribed concurrently, at most
+    TRANSCRIPTION_MAX_WORKERS at a time.
+    """
+    client = client or get_async_gemini_client()
+
+    chunking = getattr(settings, "TRANSCRIPTION_CHUNKING", False)
+    if not chunking or os.path.getsize(audio_path) <= INLINE_UPLOAD_LIMIT:
+        return await atranscribe_audio_part(audio_path, client)
+
+    window = getattr(settings, "TRANSCRIPTION_CHUNK_SECONDS", 600)
+    overlap = getattr(settings, "TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", 10)
+    semaphore = asyncio.Semaphore(getattr(settings, "TRANSCRIPTION_MAX_WORKERS", 4))
+
+    async def transcribe_chunk(path):
+        async with semaphore:
+            return await atranscribe_audio_part(path, client)
+
+    chunk_paths = await run_blocking(split_audio, audio_path, window, overlap)
+    try:
+        parts = await asyncio.gather(*(transcribe_chunk(path) for path in chunk_paths))
+    finally:
+        for chunk_path in chunk_paths:
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+
+    transcript = parts[0]
+    for part in parts[1:]:
+        transcript = merge_overlapping_transcripts(transcript, part)
+    return transcript
+
+
+async def agenerate_questions_with_gemini(transcript: str, video_title: str, client=None) -> dict:
+    client = client or get_async_gemini_client()
+
+    async def attempt():
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=build_question_prompt(transcript, video_title),
+            config=build_question_config(),
+        )
+        return questions_from_response(response, video_title)
+
+    return await acall_with_retry(attempt, "questions")
+
+
+async def agenerate_quiz_from_audio(audio_bytes: bytes, mime_type: str, video_title: str, client=None) -> dict:
+    """
+    Async counterpart of `generate_quiz_from_audio`.
+    """
+    client = client or get_async_gemini_client()
+    audio_part = get_genai_types().Part.from_bytes(data=audio_bytes, mime_type=mime_type)
+
+    async def attempt():
+        response = await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[build_audio_question_prompt(video_title), audio_part],
+            config=build_question_config(build_question_schema()),
+        )
+        return questions_from_response(response, video_title)
+
+    return await acall_with_retry(attempt, "one_shot_quiz")
+
+
+async def atranscribe_with_cache(video_id, video_title: str, audio_checksum: str, transcribe) -> tuple[str, str]:
+    """
+    Async counterpart of `transcribe_with_cache`; `transcribe` is a coroutine function.
+    """
+    cached = await sync_to_async(get_cached_transcript)(audio_checksum=audio_checksum)
+    if cached:
+        return cached.text, video_title
+
+    try:
+        transcript = await transcribe()
+    except Exception as exc:
+        raise ValueError(f"Could not transcribe audio: {exc}") from exc
+
+    await sync_to_async(store_transcript)(video_id, video_title, transcript, audio_checksum)
+    return transcript, video_title
+
+
+async def aget_transcript_for_url(url: str) -> tuple[str, str]:
+    """
+    Async counterpart of `get_transcript_for_url`.
+    """
+    video_id = extract_youtube_video_id(url)
+    cached = await sync_to_async(get_cached_transcript)(video_id=video_id)
+    if cached:
+        return cached.text, cached.title
+
+    async with async_youtube_audio(url) as audio:
+        return await atranscribe_downloaded_audio(video_id, audio)
+
+
+@asynccontextmanager
+async def async_youtube_audio(url: str):
+    """
+    Async counterpart of `youtube_audio`; downloads run on the blocking executor.
+    """
+    if getattr(settings, "AUDIO_STREAMING", False):
+        streamed = None
+        async with astage_limit("download"):
+            try:
+                streamed = await run_blocking(stream_audio_from_youtube, url)
+            except Exception as exc:
+                logger.warning("Streaming download failed, using file download: %s", exc)
+
+        if streamed is not None:
+            audio_bytes, video_title, mime_type = streamed
+            yield {
+                "title": video_title,
+                "checksum": hashlib.sha256(audio_bytes).hexdigest(),
+                "mime_type": mime_type,
+                "bytes": audio_bytes,
+                "path": None,
+            }
+            return
+
+    async with async_audio_workspace() as workspace:
+        try:
+            async with astage_limit("download"):
+                audio_path, video_title = await run_blocking(download_audio_from_youtube, url, workspace)
+            audio_checksum = await run_blocking(file_checksum, audio_path)
+        except StageBusy:
+            raise
+        except Exception as exc:
+            raise ValueError(f"Could not download audio: {exc}") from exc
+
+        yield {
+            "title": video_title,
+            "checksum": audio_checksum,
+            "mime_type": mime_type_for_path(audio_path),
+            "bytes": None,
+            "path": audio_path,
+        }
+
+
+async def atranscribe_downloaded_audio(video_id, audio: dict) -> tuple[str, str]:
+    backend = get_transcription_backend()
+
+    async def transcribe():
+        if audio["bytes"] is not None:
+            return await backend.atranscribe_bytes(audio["bytes"], audio["mime_type"])
+        return await backend.atranscribe(audio["path"])
+
+    return await atranscribe_with_cache(video_id, audio["title"], audio["checksum"], transcribe)
+
+
+async def agenerate_quiz_from_youtube(url: str) -> dict:
+    """
+    Async counterpart of `generate_quiz_from_youtube`. Gemini calls are awaited
+    through `client.aio`; downloads and ffmpeg run on the blocking executor.
+    """
+    video_id = extract_youtube_video_id(url)
+
+    if one_shot_enabled() and not await sync_to_async(get_cached_transcript)(video_id=video_id):
+        async with async_youtube_audio(url) as audio:
+            audio_bytes = await run_blocking(one_shot_audio_bytes, audio)
+            if audio_bytes is not None:
+                try:
+                    return await agenerate_quiz_from_audio(audio_bytes, audio["mime_type"], audio["title"])
+                except Exception as exc:
+                    raise ValueError(f"Could not generate quiz questions: {exc}") from exc
+
+            transcript, video_title = await atranscribe_downloaded_audio(video_id, audio)
+    else:
+        transcript, video_title = await aget_transcript_for_url(url)
+
+    try:
+        return await agenerate_questions_with_gemini(transcript, video_title)
+    except Exception as exc:
+        raise ValueError(f"Could not generate quiz questions: {exc}") from exc
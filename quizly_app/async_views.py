@@ -0,0 +1,136 @@
+import json
+from functools import wraps
+
+from django.db.models import Count
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from user_auth_app.authentication import CookieJWTAuthentication
+from .cache import acache_quiz_detail, aget_cached_quiz_detail, etag_matches
+from .jobs import QueueFull, aenqueue_quiz_job
+from .models import Quiz, QuizJob
+from .pagination import QuizCursorPagination
+from .serializers import CreateQuizSerializer, QuizJobSerializer, QuizSummarySerializer, aquiz_detail_data
+
+
+def json_response(data, status_code=status.HTTP_200_OK, **headers) -> HttpResponse:
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def async_authenticated(view):
+    """
+    Authenticate an async view with the access token cookie, like
+    `IsAuthenticated` does for the DRF views.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await CookieJWTAuthentication().aauthenticate(request)
+        except AuthenticationFailed as exc:
+            return json_response({"detail": str(exc.detail)}, status.HTTP_403_FORBIDDEN)
+
+        if result is None:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status.HTTP_403_FORBIDDEN,
+            )
+
+        request.user = result[0]
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@async_authenticated
+async def quiz_list(request):
+    """
+    Async variant of the quiz list (summaries, cursor-paginated) and create endpoints.
+    """
+    if request.method == "POST":
+        return await create_quiz(request)
+
+    queryset = Quiz.objects.filter(user=request.user).annotate(question_count=Count("questions"))
+    paginator = QuizCursorPagination()
+
+    try:
+        page = await paginator.apaginate_queryset(queryset, Request(request))
+    except NotFound as exc:
+        return json_response({"detail": str(exc.detail)}, status.HTTP_404_NOT_FOUND)
+
+    if page is None:
+        quizzes = [quiz async for quiz in queryset.order_by(*QuizCursorPagination.ordering)]
+        return json_response(QuizSummarySerializer(quizzes, many=True).data)
+
+    return json_response({
+        "next": paginator.get_next_link(),
+        "results": QuizSummarySerializer(page, many=True).data,
+    })
+
+
+async def create_quiz(request):
+    """
+    Queue a generation job. The pipeline runs as a task on this event loop,
+    so in-flight generations do not each hold a thread while Gemini works.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return json_response({"detail": "Invalid JSON."}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = CreateQuizSerializer(data=payload)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        job = await aenqueue_quiz_job(request.user, serializer.validated_data["url"])
+    except QueueFull as exc:
+        return json_response(
+            {"detail": str(exc)},
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            **{"Retry-After": str(exc.retry_after)},
+        )
+    job = await QuizJob.objects.select_related("quiz").prefetch_related("quiz__questions").aget(pk=job.pk)
+
+    return json_response(
+        QuizJobSerializer(job).data,
+        status.HTTP_202_ACCEPTED,
+        Location=reverse("quiz-job-detail", args=[job.id]),
+    )
+
+
+@require_GET
+@async_authenticated
+async def quiz_detail(request, pk):
+    """
+    Async variant of the quiz detail endpoint, sharing the rendered-JSON cache and ETags.
+    """
+    entry = await aget_cached_quiz_detail(pk)
+    if entry is None:
+        data = await aquiz_detail_data(pk, request.user)
+        if data is None:
+            return json_response({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+        entry = await acache_quiz_detail(pk, request.user.pk, JSONRenderer().render(data))
+
+    if entry["user_id"] != request.user.pk:
+        return json_response({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+
+    if etag_matches(request.headers.get("If-None-Match"), entry["etag"]):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(entry["body"], content_type="application/json")
+
+    response["ETag"] = entry["etag"]
+    response["Cache-Control"] = "private, no-cache"
+    return response
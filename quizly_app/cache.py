@@ -0,0 +1,86 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+
+def quiz_detail_cache_key(quiz_id) -> str:
+    return f"quiz-detail:{quiz_id}"
+
+
+def get_cached_quiz_detail(quiz_id) -> dict | None:
+    """
+    Return the cached entry {"user_id", "etag", "body"} for a quiz, if any.
+    """
+    return cache.get(quiz_detail_cache_key(quiz_id))
+
+
+async def aget_cached_quiz_detail(quiz_id) -> dict | None:
+    return await cache.aget(quiz_detail_cache_key(quiz_id))
+
+
+def cache_quiz_detail(quiz_id, user_id, body: bytes) -> dict:
+    """
+    Store the rendered JSON of a quiz together with its owner and ETag.
+    """
+    entry = build_cache_entry(user_id, body)
+    cache.set(quiz_detail_cache_key(quiz_id), entry, getattr(settings, "QUIZ_DETAIL_CACHE_TIMEOUT", 3600))
+    return entry
+
+
+async def acache_quiz_detail(quiz_id, user_id, body: bytes) -> dict:
+    entry = build_cache_entry(user_id, body)
+    await cache.aset(quiz_detail_cache_key(quiz_id), entry, getattr(settings, "QUIZ_DETAIL_CACHE_TIMEOUT", 3600))
+    return entry
+
+
+def build_cache_entry(user_id, body: bytes) -> dict:
+    return {
+        "user_id": user_id,
+        "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+        "body": body,
+    }
+
+
+def invalidate_quiz_detail(quiz_id):
+    cache.delete(quiz_detail_cache_key(quiz_id))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header (possibly a list or weak tags) against an ETag.
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+class PrerenderedJSONResponse(Response):
+    """
+    DRF response whose JSON body was rendered earlier (taken from the cache),
+    so finalizing it does not serialize or render anything again.
+    `data` is decoded lazily for callers that still want it.
+    """
+    def __init__(self, body: bytes, **kwargs):
+        self._body_bytes = body
+        self._data = None
+        super().__init__(None, content_type="application/json", **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None and self._body_bytes:
+            self._data = json.loads(self._body_bytes)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self["Content-Type"] = "application/json"
+        return self._body_bytes
@@ -0,0 +1,476 @@
+import asyncio
+import logging
+import threading
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .async_utils import agenerate_quiz_from_youtube
+from .models import QuizJob
+from .services import create_quiz_with_questions
+from .utils import extract_youtube_video_id, generate_quiz_from_youtube
+
+
+logger = logging.getLogger(__name__)
+
+_worker_lock = threading.Lock()
+_worker_threads: list[threading.Thread] = []
+_wake_event = threading.Event()
+_async_tasks: set[asyncio.Task] = set()
+
+
+class QueueFull(Exception):
+    """Raised instead of queueing when too many pipelines are already in flight."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many quizzes are being generated right now, try again later.")
+        self.retry_after = retry_after
+
+
+def check_queue_capacity(video_url: str):
+    """
+    Refuse new pipelines once QUIZ_QUEUE_MAX_ACTIVE leader jobs are pending or
+    running. Requests for a video already in flight only follow it and are
+    always accepted. This is a soft limit: concurrent requests may overshoot it slightly.
+    """
+    limit = getattr(settings, "QUIZ_QUEUE_MAX_ACTIVE", 0)
+    if not limit:
+        return
+
+    active = QuizJob.objects.filter(is_leader=True, status__in=QuizJob.ACTIVE_STATUSES)
+    if active.filter(video_key=get_video_key(video_url)).exists():
+        return
+    if active.count() >= limit:
+        raise QueueFull(getattr(settings, "QUIZ_QUEUE_RETRY_AFTER", 30))
+
+
+def enqueue_quiz_job(user, video_url: str) -> QuizJob:
+    """
+    Store a pending job and hand it to the background worker.
+    In eager mode a leader is executed before returning; a follower is
+    finished by its leader (see `finish_followers`).
+    Raises QueueFull when the queue is at capacity.
+    """
+    check_queue_capacity(video_url)
+    job = create_coalesced_job(user, video_url)
+
+    if getattr(settings, "QUIZ_JOBS_EAGER", False):
+        claimed = claim_job(job.pk) if job.is_leader else None
+        if claimed is not None:
+            run_quiz_job(claimed)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(wake_worker)
+
+    return job
+
+
+def get_video_key(video_url: str) -> str:
+    """
+    Key used to coalesce requests: the canonical YouTube id, or the URL itself.
+    """
+    video_id = extract_youtube_video_id(video_url)
+    return f"youtube:{video_id}" if video_id else video_url
+
+
+def create_coalesced_job(user, video_url: str) -> QuizJob:
+    """
+    Create a job that either leads a new pipeline for its video or follows
+    the one already in flight. The partial unique constraint on active
+    leaders decides races between processes; the leader row is locked while
+    a follower attaches so it cannot finish in between.
+    """
+    video_key = get_video_key(video_url)
+
+    for _ in range(5):
+        leader = (
+            QuizJob.objects.filter(
+                video_key=video_key,
+                is_leader=True,
+                status__in=QuizJob.ACTIVE_STATUSES,
+            )
+            .order_by("id")
+            .first()
+        )
+
+        try:
+            with transaction.atomic():
+                if leader is None:
+                    return QuizJob.objects.create(
+                        user=user,
+                        video_url=video_url,
+                        video_key=video_key,
+                    )
+
+                leader = (
+                    QuizJob.objects.select_for_update()
+                    .filter(pk=leader.pk, status__in=QuizJob.ACTIVE_STATUSES)
+                    .first()
+                )
+                if leader is None:
+                    continue
+
+                return QuizJob.objects.create(
+                    user=user,
+                    video_url=video_url,
+                    video_key=video_key,
+                    is_leader=False,
+                    leader=leader,
+                )
+        except IntegrityError:
+            # Another process became leader first; attach to it on the next pass.
+            continue
+
+    raise RuntimeError(f"Could not queue quiz job for {video_url}.")
+
+
+def claim_next_job() -> QuizJob | None:
+    """
+    Atomically move the oldest runnable job to RUNNING and return it.
+    The conditional UPDATE makes this safe across worker processes.
+    Followers only become runnable once their leader has finished.
+    """
+    candidates = (
+        QuizJob.objects.filter(status=QuizJob.Status.PENDING)
+        .filter(Q(leader__isnull=True) | Q(leader__status__in=QuizJob.FINISHED_STATUSES))
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)[:10]
+    )
+
+    for job_id in candidates:
+        job = claim_job(job_id)
+        if job is not None:
+            return job
+
+    return None
+
+
+def claim_values() -> dict:
+    now = timezone.now()
+    return {
+        "status": QuizJob.Status.RUNNING,
+        "claim_token": uuid.uuid4().hex,
+        "started_at": now,
+        "heartbeat_at": now,
+        "updated_at": now,
+    }
+
+
+def claim_job(job_id: int) -> QuizJob | None:
+    """
+    Claim one pending job with a conditional UPDATE and a fresh claim token.
+    """
+    claimed = QuizJob.objects.filter(pk=job_id, status=QuizJob.Status.PENDING).update(**claim_values())
+    if not claimed:
+        return None
+    return QuizJob.objects.get(pk=job_id)
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Put RUNNING jobs back into the queue when their worker died mid-way,
+    i.e. stopped refreshing heartbeat_at for QUIZ_JOB_TIMEOUT seconds.
+    """
+    timeout = getattr(settings, "QUIZ_JOB_TIMEOUT", 900)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+
+    return QuizJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=QuizJob.Status.RUNNING,
+    ).update(
+        status=QuizJob.Status.PENDING,
+        claim_token="",
+        started_at=None,
+        heartbeat_at=None,
+        updated_at=timezone.now(),
+    )
+
+
+def owned_job(job: QuizJob):
+    """
+    The job's row, as long as this worker still holds its claim.
+    """
+    return QuizJob.objects.filter(pk=job.pk, status=QuizJob.Status.RUNNING, claim_token=job.claim_token)
+
+
+@contextmanager
+def job_heartbeat(job: QuizJob):
+    """
+    Refresh heartbeat_at every QUIZ_JOB_HEARTBEAT_INTERVAL seconds from a
+    side thread while the block runs.
+    """
+    interval = getattr(settings, "QUIZ_JOB_HEARTBEAT_INTERVAL", 30)
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                if not owned_job(job).update(heartbeat_at=timezone.now()):
+                    return
+        except Exception:
+            logger.exception("Heartbeat for quiz job %s failed", job.pk)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True, name=f"quiz-job-{job.pk}-heartbeat")
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+@asynccontextmanager
+async def ajob_heartbeat(job: QuizJob):
+    interval = getattr(settings, "QUIZ_JOB_HEARTBEAT_INTERVAL", 30)
+
+    async def beat():
+        while True:
+            await asyncio.sleep(interval)
+            if not await owned_job(job).aupdate(heartbeat_at=timezone.now()):
+                return
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+def get_job_data(job: QuizJob) -> dict:
+    """
+    Run the pipeline for leaders; followers reuse their leader's result.
+    """
+    leader = job.leader
+    if leader is None:
+        return generate_quiz_from_youtube(job.video_url)
+
+    if leader.status == QuizJob.Status.DONE and leader.result:
+        return leader.result
+
+    raise ValueError(leader.error or "Quiz generation failed.")
+
+
+def run_quiz_job(job: QuizJob) -> QuizJob:
+    """
+    Execute the generation pipeline for a claimed job and record the outcome.
+    If the job was requeued and claimed by another worker meanwhile, the
+    result is discarded.
+    """
+    with job_heartbeat(job):
+        try:
+            data = get_job_data(job)
+            saved = complete_quiz_job(job, data)
+        except Exception as exc:
+            record_job_failure(job, exc)
+            saved = save_job_result(job)
+
+    if not saved:
+        logger.warning("Quiz job %s lost its claim, result discarded", job.pk)
+    elif job.is_leader:
+        finish_followers(job)
+    return job
+
+
+def finish_followers(leader: QuizJob):
+    """
+    Run the followers waiting on `leader` right after its outcome was saved.
+    No follower can attach any more once the leader has finished.
+    Workers still pick up followers whose leader died before getting here.
+    """
+    pending = QuizJob.objects.filter(leader=leader, status=QuizJob.Status.PENDING)
+    for job_id in list(pending.order_by("id").values_list("id", flat=True)):
+        follower = claim_job(job_id)
+        if follower is not None:
+            run_quiz_job(follower)
+
+
+JOB_RESULT_FIELDS = ["status", "quiz", "result", "error", "finished_at", "updated_at"]
+
+
+def save_job_result(job: QuizJob) -> bool:
+    """
+    Write the outcome only if this worker still holds the claim.
+    """
+    job.updated_at = timezone.now()
+    return owned_job(job).update(**{field: getattr(job, field) for field in JOB_RESULT_FIELDS}) == 1
+
+
+def complete_quiz_job(job: QuizJob, data: dict) -> bool:
+    """
+    Create the quiz and mark the job done in one transaction, rolled back
+    when the claim was lost so no duplicate quiz is left behind.
+    """
+    with transaction.atomic():
+        quiz = create_quiz_with_questions(job.user, job.video_url, data)
+        record_job_success(job, quiz, data)
+        if save_job_result(job):
+            return True
+        transaction.set_rollback(True)
+        return False
+
+
+def record_job_success(job: QuizJob, quiz, data: dict):
+    job.status = QuizJob.Status.DONE
+    job.quiz = quiz
+    job.error = ""
+    if job.is_leader:
+        job.result = data
+    job.finished_at = timezone.now()
+
+
+def record_job_failure(job: QuizJob, exc: Exception):
+    """
+    ValueErrors carry a message meant for the user; anything else is a crash.
+    """
+    if isinstance(exc, ValueError):
+        job.error = str(exc)
+    else:
+        logger.exception("Quiz job %s crashed", job.pk, exc_info=exc)
+        job.error = "Quiz generation failed."
+    job.status = QuizJob.Status.FAILED
+    job.finished_at = timezone.now()
+
+
+async def aclaim_job(job_id: int) -> QuizJob | None:
+    """
+    Claim one specific pending job for the async runner, with the same
+    conditional UPDATE the worker threads use.
+    """
+    claimed = await QuizJob.objects.filter(
+        pk=job_id,
+        status=QuizJob.Status.PENDING,
+    ).aupdate(**claim_values())
+
+    if not claimed:
+        return None
+    return await QuizJob.objects.select_related("user", "leader").aget(pk=job_id)
+
+
+async def arun_quiz_job(job: QuizJob) -> QuizJob:
+    """
+    Async counterpart of `run_quiz_job`. Leaders run the async pipeline, so
+    waiting on Gemini does not hold a thread. `job` must have `user` and
+    `leader` loaded (see `aclaim_job`).
+    """
+    async with ajob_heartbeat(job):
+        try:
+            if job.leader_id is None:
+                data = await agenerate_quiz_from_youtube(job.video_url)
+            else:
+                data = get_job_data(job)
+            saved = await sync_to_async(complete_quiz_job)(job, data)
+        except Exception as exc:
+            record_job_failure(job, exc)
+            saved = await sync_to_async(save_job_result)(job)
+
+    if not saved:
+        logger.warning("Quiz job %s lost its claim, result discarded", job.pk)
+    elif job.is_leader:
+        await sync_to_async(finish_followers)(job)
+    return job
+
+
+async def aenqueue_quiz_job(user, video_url: str) -> QuizJob:
+    """
+    Async counterpart of `enqueue_quiz_job` for ASGI views. A new leader job
+    is claimed and run as a task on the running event loop; followers are
+    finished by their leader once it is done.
+    """
+    await sync_to_async(check_queue_capacity)(video_url)
+    job = await sync_to_async(create_coalesced_job)(user, video_url)
+
+    if getattr(settings, "QUIZ_JOBS_EAGER", False):
+        claimed = await aclaim_job(job.pk) if job.is_leader else None
+        if claimed is not None:
+            await arun_quiz_job(claimed)
+        await job.arefresh_from_db()
+    elif job.is_leader:
+        task = asyncio.create_task(_run_claimed_job(job.pk))
+        _async_tasks.add(task)
+        task.add_done_callback(_async_tasks.discard)
+    else:
+        await sync_to_async(wake_worker)()
+
+    return job
+
+
+async def _run_claimed_job(job_id: int):
+    try:
+        job = await aclaim_job(job_id)
+        if job is not None:
+            await arun_quiz_job(job)
+    except Exception:
+        logger.exception("Async quiz job %s failed", job_id)
+    finally:
+        await sync_to_async(wake_worker)()
+
+
+def process_pending_jobs(limit: int | None = None) -> int:
+    """
+    Run queued jobs until the queue is empty or `limit` jobs were processed.
+    """
+    processed = 0
+
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_quiz_job(job)
+        processed += 1
+
+    return processed
+
+
+def run_worker_loop(stop_event: threading.Event | None = None):
+    """
+    Poll the job table forever (or until `stop_event` is set).
+    Used by the in-process worker threads and the `run_quiz_worker` command.
+    """
+    poll_interval = getattr(settings, "QUIZ_JOB_POLL_INTERVAL", 2.0)
+
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        try:
+            requeue_stale_jobs()
+            process_pending_jobs()
+        except Exception:
+            logger.exception("Quiz worker loop failed")
+        finally:
+            close_old_connections()
+
+        _wake_event.wait(poll_interval)
+        _wake_event.clear()
+
+
+def wake_worker():
+    """
+    Start the in-process worker threads if needed and wake them up.
+    """
+    ensure_worker_started()
+    _wake_event.set()
+
+
+def ensure_worker_started():
+    thread_count = getattr(settings, "QUIZ_JOB_WORKER_THREADS", 2)
+    if thread_count <= 0:
+        return
+
+    with _worker_lock:
+        _worker_threads[:] = [t for t in _worker_threads if t.is_alive()]
+
+        while len(_worker_threads) < thread_count:
+            thread = threading.Thread(
+                target=run_worker_loop,
+                name=f"quiz-worker-{len(_worker_threads) + 1}",
+                daemon=True,
+            )
+            thread.start()
+            _worker_threads.append(thread)
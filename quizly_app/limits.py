@@ -0,0 +1,273 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: limits only apply within one process.
+    fcntl = None
+
+
+POLL_INTERVAL = 0.2
+
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class StageBusy(ValueError):
+    """Raised when a pipeline stage stays saturated for longer than STAGE_WAIT_TIMEOUT."""
+
+
+def get_lock_dir() -> Path:
+    root = Path(getattr(settings, "STAGE_LOCK_DIR", None) or Path(tempfile.gettempdir()) / "quizly-locks")
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _thread_lock(path: Path) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(str(path), threading.Lock())
+
+
+def _try_lock_file(path: Path):
+    """
+    Take an exclusive lock on `path` without blocking. Returns the open file
+    (keep it to hold the lock) or None. The OS drops the lock if the process dies.
+    """
+    lock = _thread_lock(path)
+    if not lock.acquire(blocking=False):
+        return None
+
+    handle = open(path, "a+")
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            lock.release()
+            return None
+    return handle
+
+
+def _unlock_file(path: Path, handle):
+    if fcntl is not None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+    handle.close()
+    _thread_lock(path).release()
+
+
+class StageLimiter:
+    """
+    Counting semaphore shared by all processes on a host: one lock file per
+    slot under STAGE_LOCK_DIR, a slot is taken by locking its file.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+
+    def slot_paths(self):
+        root = get_lock_dir()
+        return [root / f"{self.name}.{slot}.lock" for slot in range(self.limit)]
+
+    def try_acquire(self):
+        for path in self.slot_paths():
+            handle = _try_lock_file(path)
+            if handle is not None:
+                return path, handle
+        return None
+
+    def release(self, slot):
+        _unlock_file(*slot)
+
+    def deadline(self):
+        return time.monotonic() + getattr(settings, "STAGE_WAIT_TIMEOUT", 300)
+
+    def busy(self):
+        return StageBusy(f"Too many requests in progress ({self.name}), try again later.")
+
+    @contextmanager
+    def acquire(self):
+        if self.limit <= 0:
+            yield
+            return
+
+        deadline = self.deadline()
+        while (slot := self.try_acquire()) is None:
+            if time.monotonic() >= deadline:
+                raise self.busy()
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            yield
+        finally:
+            self.release(slot)
+
+    async def wait_for_slot(self):
+        deadline = self.deadline()
+        while (slot := self.try_acquire()) is None:
+            if time.monotonic() >= deadline:
+                raise self.busy()
+            await asyncio.sleep(POLL_INTERVAL)
+        return slot
+
+    @asynccontextmanager
+    async def acquire_async(self):
+        if self.limit <= 0:
+            yield
+            return
+
+        slot = await self.wait_for_slot()
+        try:
+            yield
+        finally:
+            self.release(slot)
+
+
+def stage_limit(stage: str):
+    """
+    Hold one of the STAGE_CONCURRENCY[stage] slots for the duration of the block.
+    """
+    return StageLimiter(stage, getattr(settings, "STAGE_CONCURRENCY", {}).get(stage, 0)).acquire()
+
+
+def astage_limit(stage: str):
+    return StageLimiter(stage, getattr(settings, "STAGE_CONCURRENCY", {}).get(stage, 0)).acquire_async()
+
+
+class TokenBucket:
+    """
+    Token bucket whose state lives in a JSON file guarded by a file lock,
+    so every process on the host draws from the same budget.
+    `rate` is tokens per second, `capacity` the burst size.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+
+    def take(self) -> float:
+        """
+        Take a token if one is available. Returns 0 on success, otherwise
+        the seconds to wait before the next token is due.
+        """
+        path = get_lock_dir() / f"{self.name}.bucket"
+        while (handle := _try_lock_file(path)) is None:
+            time.sleep(0.01)
+
+        try:
+            handle.seek(0)
+            try:
+                state = json.loads(handle.read() or "{}")
+            except ValueError:
+                state = {}
+
+            now = time.time()
+            tokens = min(
+                self.capacity,
+                state.get("tokens", self.capacity) + (now - state.get("updated", now)) * self.rate,
+            )
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps({"tokens": tokens, "updated": now}))
+            handle.flush()
+            return wait
+        finally:
+            _unlock_file(path, handle)
+
+    def wait(self):
+        while (delay := self.take()) > 0:
+            time.sleep(delay)
+
+    async def await_token(self):
+        """
+        `take` opens, locks and writes the state file, and spins while another
+        process holds it, so it runs off the event loop.
+        """
+        take = sync_to_async(self.take, thread_sensitive=False)
+        while (delay := await take()) > 0:
+            await asyncio.sleep(delay)
+
+
+def get_gemini_bucket() -> TokenBucket | None:
+    per_minute = getattr(settings, "GEMINI_REQUESTS_PER_MINUTE", 0)
+    if per_minute <= 0:
+        return None
+    return TokenBucket("gemini", per_minute / 60, getattr(settings, "GEMINI_BURST", 10))
+
+
+@contextmanager
+def gemini_call_slot():
+    """
+    Wait for the Gemini rate limit and a concurrency slot before calling Gemini.
+    """
+    bucket = get_gemini_bucket()
+    with stage_limit("gemini"):
+        if bucket is not None:
+            bucket.wait()
+        yield
+
+
+def try_gemini_call_slot() -> ExitStack | None:
+    """
+    Non-blocking `gemini_call_slot`: an ExitStack holding a slot and a token,
+    or None if either is not available right now.
+    """
+    limiter = StageLimiter("gemini", getattr(settings, "STAGE_CONCURRENCY", {}).get("gemini", 0))
+    held = ExitStack()
+    if limiter.limit > 0:
+        slot = limiter.try_acquire()
+        if slot is None:
+            return None
+        held.callback(limiter.release, slot)
+
+    bucket = get_gemini_bucket()
+    if bucket is not None and bucket.take() > 0:
+        held.close()
+        return None
+    return held
+
+
+async def await_gemini_call_slot() -> ExitStack:
+    """
+    Async: wait for a Gemini slot and rate-limit token. The returned ExitStack
+    releases the slot, so it can be handed to the task making the call.
+    """
+    limiter = StageLimiter("gemini", getattr(settings, "STAGE_CONCURRENCY", {}).get("gemini", 0))
+    held = ExitStack()
+    if limiter.limit > 0:
+        held.callback(limiter.release, await limiter.wait_for_slot())
+
+    bucket = get_gemini_bucket()
+    if bucket is not None:
+        try:
+            await bucket.await_token()
+        except BaseException:
+            held.close()
+            raise
+    return held
+
+
+async def atry_gemini_call_slot() -> ExitStack | None:
+    return await sync_to_async(try_gemini_call_slot, thread_sensitive=False)()
+
+
+@asynccontextmanager
+async def agemini_call_slot():
+    with await await_gemini_call_slot():
+        yield
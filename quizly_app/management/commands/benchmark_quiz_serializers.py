@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from quizly_app.models import Quiz, Question
+from quizly_app.serializers import QuizSerializer, quiz_detail_data
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare QuizSerializer with the fast detail read path on quizzes of different sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+        parser.add_argument("--iterations", type=int, default=50)
+
+    def handle(self, *args, **options):
+        header = f"{'questions':>9} {'serializer ms':>14} {'fast path ms':>13} {'speedup':>8} {'identical':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        # Everything is created inside a transaction that is rolled back at the end.
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username="benchmark-serializers",
+                email="benchmark-serializers@example.com",
+            )
+
+            for size in options["sizes"]:
+                quiz = self.create_quiz(user, size)
+                self.stdout.write(self.run_size(quiz, user, size, options["iterations"]))
+
+            transaction.set_rollback(True)
+
+    def create_quiz(self, user, size):
+        quiz = Quiz.objects.create(user=user, title=f"Benchmark {size}", video_url="https://example.com")
+        Question.objects.bulk_create([
+            Question(
+                quiz=quiz,
+                question_title=f"Question {i}?",
+                question_options=["Paris", "London", "Berlin", "Rome"],
+                answer="ABCD"[i % 4],
+            )
+            for i in range(size)
+        ])
+        return quiz
+
+    def run_size(self, quiz, user, size, iterations):
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            return renderer.render(QuizSerializer(Quiz.objects.prefetch_related("questions").get(pk=quiz.pk)).data)
+
+        def fast_path():
+            return renderer.render(quiz_detail_data(quiz.pk, user))
+
+        identical = serializer_path() == fast_path()
+        serializer_ms = self.time_per_call(serializer_path, iterations)
+        fast_ms = self.time_per_call(fast_path, iterations)
+
+        return (
+            f"{size:>9} {serializer_ms:>14.2f} {fast_ms:>13.2f} "
+            f"{serializer_ms / fast_ms:>7.1f}x {str(identical):>10}"
+        )
+
+    def time_per_call(self, func, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) * 1000 / iterations
@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+
+from django.core.management.base import BaseCommand, CommandError
+
+from downloader.services import probe_duration
+from quizly_app.transcription import get_transcription_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Transcribe local audio files with each transcription backend and compare "
+        "speed and agreement. Files are submitted concurrently, like queued jobs, "
+        "so batching backends can group them. Nothing is cached or stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="Audio files to transcribe.")
+        parser.add_argument("--backends", nargs="+", default=["gemini", "whisper"])
+        parser.add_argument("--concurrency", type=int, default=4, help="Files submitted at the same time.")
+
+    def handle(self, *args, **options):
+        files = options["files"]
+        try:
+            audio_seconds = sum(probe_duration(path) for path in files)
+        except (OSError, RuntimeError) as exc:
+            raise CommandError(str(exc))
+
+        header = f"{'backend':>10} {'seconds':>9} {'x realtime':>11} {'words':>7} {'agreement':>10}"
+        self.stdout.write(f"{len(files)} file(s), {audio_seconds:.0f}s of audio")
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        reference = None
+        for name in options["backends"]:
+            backend = get_transcription_backend(name)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(options["concurrency"], 1)) as executor:
+                transcripts = list(executor.map(backend.transcribe, files))
+            elapsed = time.perf_counter() - started
+
+            words = [transcript.lower().split() for transcript in transcripts]
+            if reference is None:
+                reference = words
+            agreement = sum(
+                SequenceMatcher(None, first, second, autojunk=False).ratio()
+                for first, second in zip(reference, words)
+            ) / len(files)
+
+            self.stdout.write(
+                f"{name:>10} {elapsed:>9.1f} {audio_seconds / elapsed:>10.1f}x "
+                f"{sum(len(w) for w in words):>7} {agreement:>9.0%}"
+            )
@@ -0,0 +1,79 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from quizly_app.services import create_quizzes_with_questions
+from quizly_app.utils import validate_question_item
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import quizzes from a JSON file. The file holds a list of objects with "
+        "'video_url', 'title', 'description', 'questions' and optionally 'user' (email)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON file to import.")
+        parser.add_argument("--user", help="Email of the owner for entries without 'user'.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8") as handle:
+                entries = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read {options['path']}: {exc}") from exc
+
+        if not isinstance(entries, list):
+            raise CommandError("The import file must contain a list of quizzes.")
+
+        self.users = {}
+
+        quizzes = [self.validate_entry(index, entry, options["user"]) for index, entry in enumerate(entries, start=1)]
+        create_quizzes_with_questions(quizzes)
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(quizzes)} quiz(zes)."))
+
+    def validate_entry(self, index: int, entry, default_email: str | None) -> tuple:
+        """
+        Check one entry before anything is written; returns (user, video_url, data).
+        """
+        if not isinstance(entry, dict):
+            raise CommandError(f"Entry {index} is not an object.")
+
+        email = entry.get("user") or default_email
+        if not email:
+            raise CommandError(f"Entry {index} has no user and --user was not given.")
+
+        if email not in self.users:
+            try:
+                self.users[email] = User.objects.get(email=email)
+            except User.DoesNotExist as exc:
+                raise CommandError(f"Entry {index}: unknown user {email}.") from exc
+
+        for key in ("video_url", "questions"):
+            if not entry.get(key):
+                raise CommandError(f"Entry {index} is missing '{key}'.")
+        if not isinstance(entry["questions"], list):
+            raise CommandError(f"Entry {index}: 'questions' must be a list.")
+
+        try:
+            questions = [
+                validate_question_item({
+                    "question": question.get("question_title"),
+                    "options": question.get("question_options"),
+                    "answer": question.get("answer"),
+                })
+                for question in entry["questions"]
+            ]
+        except (AttributeError, ValueError) as exc:
+            raise CommandError(f"Entry {index}: {exc}") from exc
+
+        return self.users[email], entry["video_url"], {
+            "title": entry.get("title"),
+            "description": entry.get("description"),
+            "questions": questions,
+        }
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from quizly_app.jobs import process_pending_jobs, requeue_stale_jobs, run_worker_loop
+
+
+class Command(BaseCommand):
+    help = "Process queued quiz generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the current queue and exit instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            requeue_stale_jobs()
+            processed = process_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)."))
+            return
+
+        self.stdout.write("Quiz worker started. Press Ctrl+C to stop.")
+        try:
+            run_worker_loop()
+        except KeyboardInterrupt:
+            self.stdout.write("Quiz worker stopped.")
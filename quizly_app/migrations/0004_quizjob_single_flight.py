@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizly_app', '0003_transcript'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='is_leader',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='leader',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='followers', to='quizly_app.quizjob'),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='video_key',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='quizjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_leader', True), ('status__in', ['pending', 'running']), models.Q(('video_key', ''), _negated=True)), fields=('video_key',), name='unique_active_leader_per_video'),
+        ),
+    ]
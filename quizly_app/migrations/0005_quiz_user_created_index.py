@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizly_app', '0004_quizjob_single_flight'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='quiz_user_created_idx'),
+        ),
+    ]
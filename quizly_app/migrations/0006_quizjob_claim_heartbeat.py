@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizly_app', '0005_quiz_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
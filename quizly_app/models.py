@@ -16,6 +16,12 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Serves the per-user keyset pagination ordered by (created_at, id).
+            models.Index(fields=["user", "created_at", "id"], name="quiz_user_created_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -35,3 +41,85 @@ class Question(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+
+class QuizJob(models.Model):
+    """
+    Represents a background quiz generation request for a video URL.
+    """
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="quiz_jobs"
+    )
+    video_url = models.URLField()
+    video_key = models.CharField(max_length=255, blank=True, default="", db_index=True)
+    is_leader = models.BooleanField(default=True)
+    leader = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="followers"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True
+    )
+    quiz = models.ForeignKey(
+        Quiz,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker that claimed the job; it refreshes heartbeat_at while running.
+    claim_token = models.CharField(max_length=32, blank=True, default="")
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    ACTIVE_STATUSES = [Status.PENDING, Status.RUNNING]
+    FINISHED_STATUSES = [Status.DONE, Status.FAILED]
+
+    class Meta:
+        constraints = [
+            # At most one in-flight pipeline per video; later requests attach as followers.
+            models.UniqueConstraint(
+                fields=["video_key"],
+                condition=(
+                    models.Q(is_leader=True, status__in=["pending", "running"])
+                    & ~models.Q(video_key="")
+                ),
+                name="unique_active_leader_per_video",
+            ),
+        ]
+
+    def __str__(self):
+        return f"QuizJob {self.pk} ({self.status})"
+
+
+class Transcript(models.Model):
+    """
+    Cached transcript of a video, keyed by its canonical YouTube video id.
+    """
+    video_id = models.CharField(max_length=32, unique=True, null=True, blank=True)
+    title = models.CharField(max_length=255, blank=True, default="")
+    text = models.TextField()
+    audio_checksum = models.CharField(max_length=64, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title or self.video_id or self.audio_checksum
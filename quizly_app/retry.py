@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import ExitStack
+
+from django.conf import settings
+from .limits import atry_gemini_call_slot, await_gemini_call_slot, gemini_call_slot, try_gemini_call_slot
+
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    TRANSPORT_ERRORS = (httpx.TransportError,)
+except ImportError:
+    TRANSPORT_ERRORS = ()
+
+RETRYABLE_STATUS_CODES = {408, 429}
+
+
+class InvalidGeminiResponse(ValueError):
+    """Gemini answered, but with something unusable (empty, bad JSON, wrong shape)."""
+
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    Transient failures worth another attempt: rate limits, server errors,
+    timeouts, dropped connections and unusable answers.
+    """
+    if isinstance(exc, (InvalidGeminiResponse, TimeoutError, ConnectionError, *TRANSPORT_ERRORS)):
+        return True
+
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and (code in RETRYABLE_STATUS_CODES or code >= 500)
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies, used to hedge at the observed p95.
+    """
+
+    def __init__(self, size: int = 100, min_samples: int = 20):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def p95(self) -> float | None:
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+_trackers: dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    with _trackers_lock:
+        return _trackers.setdefault(name, LatencyTracker())
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff with a per-attempt timeout and an overall
+    deadline. With `hedge` a second identical request is started when the
+    first has not answered after the p95 latency seen for this call
+    (`hedge_after` until enough samples exist); the first answer wins.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        attempt_timeout: float = 120.0,
+        deadline: float = 300.0,
+        hedge: bool = False,
+        hedge_after: float = 30.0,
+    ):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            attempts=getattr(settings, "GEMINI_RETRY_ATTEMPTS", 3),
+            base_delay=getattr(settings, "GEMINI_RETRY_BASE_DELAY", 1.0),
+            max_delay=getattr(settings, "GEMINI_RETRY_MAX_DELAY", 20.0),
+            attempt_timeout=getattr(settings, "GEMINI_ATTEMPT_TIMEOUT", 120.0),
+            deadline=getattr(settings, "GEMINI_CALL_DEADLINE", 300.0),
+            hedge=getattr(settings, "GEMINI_HEDGING", False),
+            hedge_after=getattr(settings, "GEMINI_HEDGE_AFTER", 30.0),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """
+        "Full jitter": a random delay up to base * 2^(attempt-1), capped at max_delay.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def hedge_delay(self, tracker: LatencyTracker) -> float | None:
+        if not self.hedge:
+            return None
+        return tracker.p95() or self.hedge_after
+
+    def should_retry(self, exc: Exception, attempt: int, deadline: float, delay: float) -> bool:
+        return (
+            is_retryable(exc)
+            and attempt < self.attempts
+            and time.monotonic() + delay < deadline
+        )
+
+
+def _start_in_thread(func, held: ExitStack) -> Future:
+    """
+    Run `func` on its own daemon thread and release `held` (its Gemini slot)
+    when it returns. Threads cannot be cancelled, so an attempt that timed out
+    keeps its slot until the call in flight returns, but never starts a new one.
+    """
+    future = Future()
+
+    def runner():
+        with held:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    threading.Thread(target=runner, daemon=True, name="gemini-call").start()
+    return future
+
+
+def _run_attempt(func, held: ExitStack, timeout: float, hedge_delay: float | None, tracker: LatencyTracker):
+    started = time.monotonic()
+    pending = {_start_in_thread(func, held)}
+    hedged = hedge_delay is None or hedge_delay >= timeout
+
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        wait_for = remaining if hedged else min(remaining, hedge_delay - (time.monotonic() - started))
+        done, pending = wait(pending, timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is None:
+                tracker.record(time.monotonic() - started)
+                return future.result()
+        if done and not pending:
+            raise done.pop().exception()
+
+        if not done:
+            if not hedged:
+                hedged = True
+                hedge_held = try_gemini_call_slot()
+                if hedge_held is None:
+                    logger.info("Not hedging slow Gemini call, no free slot")
+                else:
+                    logger.info("Hedging slow Gemini call after %.1fs", hedge_delay)
+                    pending.add(_start_in_thread(func, hedge_held))
+            elif time.monotonic() - started >= timeout:
+                raise TimeoutError(f"Gemini call timed out after {timeout:.0f}s.")
+
+    raise TimeoutError(f"Gemini call timed out after {timeout:.0f}s.")
+
+
+def call_with_retry(func, name: str, policy: RetryPolicy | None = None):
+    """
+    Call `func()` under the retry policy (from settings by default).
+    `name` identifies the call for logging and its latency statistics.
+    Each attempt first waits for a Gemini slot and rate-limit token; only
+    the call itself counts against the attempt timeout.
+    """
+    policy = policy or RetryPolicy.from_settings()
+    tracker = get_latency_tracker(name)
+    deadline = time.monotonic() + policy.deadline
+
+    for attempt in range(1, policy.attempts + 1):
+        held = ExitStack()
+        held.enter_context(gemini_call_slot())
+
+        timeout = min(policy.attempt_timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            held.close()
+            raise TimeoutError(f"{name} did not succeed within {policy.deadline:.0f}s.")
+
+        try:
+            return _run_attempt(func, held, timeout, policy.hedge_delay(tracker), tracker)
+        except Exception as exc:
+            delay = policy.backoff(attempt)
+            if not policy.should_retry(exc, attempt, deadline, delay):
+                raise
+            logger.warning("%s failed (attempt %s/%s), retrying in %.1fs: %s", name, attempt, policy.attempts, delay, exc)
+            time.sleep(delay)
+
+
+def _start_task(make_call, held: ExitStack) -> asyncio.Task:
+    """
+    Start the call as a task that releases `held` (its Gemini slot) when it
+    finishes or is cancelled, even if it is cancelled before it started.
+    """
+    task = asyncio.ensure_future(make_call())
+    task.add_done_callback(lambda _: held.close())
+    return task
+
+
+async def _arun_attempt(make_call, held: ExitStack, timeout: float, hedge_delay: float | None, tracker: LatencyTracker):
+    started = time.monotonic()
+    pending = {_start_task(make_call, held)}
+    hedged = hedge_delay is None or hedge_delay >= timeout
+
+    try:
+        while pending:
+            elapsed = time.monotonic() - started
+            wait_for = timeout - elapsed if hedged else min(timeout, hedge_delay) - elapsed
+            done, pending = await asyncio.wait(pending, timeout=max(wait_for, 0), return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is None:
+                    tracker.record(time.monotonic() - started)
+                    return task.result()
+            if done and not pending:
+                raise done.pop().exception()
+
+            if not done:
+                if not hedged:
+                    hedged = True
+                    hedge_held = await atry_gemini_call_slot()
+                    if hedge_held is None:
+                        logger.info("Not hedging slow Gemini call, no free slot")
+                    else:
+                        logger.info("Hedging slow Gemini call after %.1fs", hedge_delay)
+                        pending.add(_start_task(make_call, hedge_held))
+                elif time.monotonic() - started >= timeout:
+                    raise TimeoutError(f"Gemini call timed out after {timeout:.0f}s.")
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise TimeoutError(f"Gemini call timed out after {timeout:.0f}s.")
+
+
+async def acall_with_retry(make_call, name: str, policy: RetryPolicy | None = None):
+    """
+    Async variant of `call_with_retry`; `make_call()` returns a new coroutine
+    per attempt. Like there, the wait for a Gemini slot is not timed.
+    Timed-out and losing hedged requests are cancelled.
+    """
+    policy = policy or RetryPolicy.from_settings()
+    tracker = get_latency_tracker(name)
+    deadline = time.monotonic() + policy.deadline
+
+    for attempt in range(1, policy.attempts + 1):
+        held = await await_gemini_call_slot()
+
+        timeout = min(policy.attempt_timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            held.close()
+            raise TimeoutError(f"{name} did not succeed within {policy.deadline:.0f}s.")
+
+        try:
+            return await _arun_attempt(make_call, held, timeout, policy.hedge_delay(tracker), tracker)
+        except Exception as exc:
+            delay = policy.backoff(attempt)
+            if not policy.should_retry(exc, attempt, deadline, delay):
+                raise
+            logger.warning("%s failed (attempt %s/%s), retrying in %.1fs: %s", name, attempt, policy.attempts, delay, exc)
+            await asyncio.sleep(delay)
@@ -1,5 +1,34 @@
 from rest_framework import serializers
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizJob
+
+
+def answer_text(answer: str, options) -> str:
+    """
+    Convert 'B' -> full option text, e.g. 'Berlin'
+    """
+    if not answer:
+        return ""
+
+    index = ord(answer.upper()) - ord("A")
+
+    try:
+        return options[index]
+    except (IndexError, TypeError):
+        return ""
+
+
+class SparseFieldsMixin:
+    """
+    Drop every field not listed in the serializer context's `fields`
+    entry (filled from `?fields=a,b` by the view).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        requested = self.context.get("fields")
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -16,21 +45,10 @@ class QuestionSerializer(serializers.ModelSerializer):
         ]
 
     def get_answer(self, obj):
-        """
-        Convert 'B' -> full option text, e.g. 'Berlin'
-        """
-        if not obj.answer:
-            return ""
-
-        index = ord(obj.answer.upper()) - ord("A")
-
-        try:
-            return obj.question_options[index]
-        except (IndexError, TypeError):
-            return ""
+        return answer_text(obj.answer, obj.question_options)
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -46,5 +64,93 @@ class QuizSerializer(serializers.ModelSerializer):
         ]
 
 
+class QuizSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Lightweight list representation without nested questions.
+    `question_count` comes from a queryset annotation.
+    """
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = [
+            "id",
+            "title",
+            "description",
+            "created_at",
+            "question_count",
+        ]
+
+
 class CreateQuizSerializer(serializers.Serializer):
-    url = serializers.URLField()
\ No newline at end of file
+    url = serializers.URLField()
+
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    quiz = QuizSerializer(read_only=True)
+
+    class Meta:
+        model = QuizJob
+        fields = [
+            "id",
+            "status",
+            "video_url",
+            "error",
+            "quiz",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+
+QUIZ_DETAIL_FIELDS = ("id", "title", "description", "created_at", "updated_at", "video_url")
+QUESTION_DETAIL_FIELDS = ("id", "question_title", "question_options", "answer", "created_at", "updated_at")
+
+_datetime_field = serializers.DateTimeField()
+
+
+def quiz_detail_data(quiz_id, user) -> dict | None:
+    """
+    Fast read path for the quiz detail endpoint. Builds plain dicts from
+    `.values()` rows and produces the same output as `QuizSerializer`
+    without per-field serializer overhead. Returns None if the quiz does not
+    exist or belongs to someone else.
+    """
+    quiz = Quiz.objects.filter(pk=quiz_id, user=user).values(*QUIZ_DETAIL_FIELDS).first()
+    if quiz is None:
+        return None
+
+    rows = Question.objects.filter(quiz_id=quiz_id).order_by("id").values_list(*QUESTION_DETAIL_FIELDS)
+    return build_quiz_detail(quiz, rows)
+
+
+async def aquiz_detail_data(quiz_id, user) -> dict | None:
+    """
+    Async variant of `quiz_detail_data` using the async ORM.
+    """
+    quiz = await Quiz.objects.filter(pk=quiz_id, user=user).values(*QUIZ_DETAIL_FIELDS).afirst()
+    if quiz is None:
+        return None
+
+    rows = Question.objects.filter(quiz_id=quiz_id).order_by("id").values_list(*QUESTION_DETAIL_FIELDS)
+    return build_quiz_detail(quiz, [row async for row in rows])
+
+
+def build_quiz_detail(quiz: dict, rows) -> dict:
+    format_datetime = _datetime_field.to_representation
+    quiz["created_at"] = format_datetime(quiz["created_at"])
+    quiz["updated_at"] = format_datetime(quiz["updated_at"])
+
+    quiz["questions"] = [
+        {
+            "id": question_id,
+            "question_title": question_title,
+            "question_options": options,
+            "answer": answer_text(answer, options),
+            "created_at": format_datetime(created_at),
+            "updated_at": format_datetime(updated_at),
+        }
+        for question_id, question_title, options, answer, created_at, updated_at in rows
+    ]
+
+    return quiz
@@ -0,0 +1,42 @@
+from django.db import transaction
+
+from .models import Quiz, Question
+
+
+def create_quiz_with_questions(user, video_url: str, data: dict) -> Quiz:
+    """
+    Persist a generated quiz and its questions as one atomic unit.
+    Questions are written with a single bulk INSERT instead of one per row.
+    `data` has the shape returned by `generate_quiz_from_youtube`.
+    """
+    return create_quizzes_with_questions([(user, video_url, data)])[0]
+
+
+def create_quizzes_with_questions(quizzes: list[tuple]) -> list[Quiz]:
+    """
+    Persist several (user, video_url, data) quizzes in one transaction, with
+    one bulk INSERT for the quizzes and one for all of their questions.
+    """
+    with transaction.atomic():
+        created = Quiz.objects.bulk_create([
+            Quiz(
+                user=user,
+                title=data["title"],
+                description=data["description"],
+                video_url=video_url
+            )
+            for user, video_url, data in quizzes
+        ])
+
+        Question.objects.bulk_create([
+            Question(
+                quiz=quiz,
+                question_title=q["question_title"],
+                question_options=q["question_options"],
+                answer=q["answer"]
+            )
+            for quiz, (_, _, data) in zip(created, quizzes)
+            for q in data["questions"]
+        ])
+
+    return created
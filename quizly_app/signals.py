@@ -1,31 +1,23 @@
-import os
-from pathlib import Path
-from django.db.models.signals import post_save, post_delete 
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.conf import settings
-from .models import Video
-from .tasks import convert_to_hls, generate_thumbnail
+from .cache import invalidate_quiz_detail
+from .models import Quiz, Question
 
 
-@receiver(post_delete, sender=Video)
-def auto_delete_file_on_delete(sender, instance, **kwargs):
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_cached_quiz(sender, instance, using, **kwargs):
     """
-    Deletes files from filesystem when the Video object is deleted.
+    Drops the cached detail response whenever a quiz is saved or deleted.
+    Runs after commit, so a read in between cannot cache the old rows again.
     """
-    if instance.video_file and instance.video_file.name:
-        if os.path.isfile(instance.video_file.path):
-            os.remove(instance.video_file.path)
+    transaction.on_commit(partial(invalidate_quiz_detail, instance.pk), using=using)
 
-    hls_dir = Path(settings.MEDIA_ROOT) / "hls" / str(instance.id)
-    if hls_dir.exists() and hls_dir.is_dir():
-        for root, dirs, files in os.walk(hls_dir, topdown=False):
-            for name in files:
-                os.remove(Path(root) / name)
-            for name in dirs:
-                os.rmdir(Path(root) / name)
-        hls_dir.rmdir()
 
-
-        
-    
-            
\ No newline at end of file
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_cached_quiz_for_question(sender, instance, using, **kwargs):
+    """
+    Drops the cached detail response of the quiz a question belongs to.
+    """
+    transaction.on_commit(partial(invalidate_quiz_detail, instance.quiz_id), using=using)
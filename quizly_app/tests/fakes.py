@@ -0,0 +1,57 @@
+import threading
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, model, contents, config=None):
+        with self.client.lock:
+            self.client.calls.append({"model": model, "contents": contents, "config": config})
+        return FakeResponse(self.client.responder(contents))
+
+
+class FakeFiles:
+    def upload(self, file, config=None):
+        return {"uploaded": str(file)}
+
+
+class FakeGeminiClient:
+    """
+    Offline stand-in for `genai.Client`. The responder receives the request
+    contents and returns the response text.
+    """
+    def __init__(self, responder=None):
+        self.responder = responder or (lambda contents: "fake transcript")
+        self.calls = []
+        self.lock = threading.Lock()
+        self.models = FakeModels(self)
+        self.files = FakeFiles()
+        self.aio = FakeAsyncClient(self)
+
+
+class FakeAsyncModels:
+    def __init__(self, models):
+        self.models = models
+
+    async def generate_content(self, model, contents, config=None):
+        return self.models.generate_content(model, contents, config)
+
+
+class FakeAsyncFiles:
+    async def upload(self, file, config=None):
+        return {"uploaded": str(file)}
+
+
+class FakeAsyncClient:
+    """
+    Stand-in for `genai.Client.aio`; records calls on the parent client.
+    """
+    def __init__(self, client):
+        self.models = FakeAsyncModels(client.models)
+        self.files = FakeAsyncFiles()
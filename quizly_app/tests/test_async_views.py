@@ -0,0 +1,105 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from quizly_app.models import Quiz, Question, QuizJob, Transcript
+from .fakes import FakeGeminiClient
+
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def generated_questions_json():
+    return json.dumps([
+        {"question": f"Question {i}?", "options": ["Paris", "London", "Berlin", "Rome"], "answer": "A"}
+        for i in range(10)
+    ])
+
+
+@pytest.fixture
+def async_client(auth_client):
+    client = AsyncClient()
+    client.cookies = auth_client.cookies
+    return client
+
+
+def get(client, url, **extra):
+    return async_to_sync(client.get)(url, **extra)
+
+
+@pytest.mark.django_db
+class TestAsyncQuizViews:
+
+    @pytest.fixture
+    def quizzes(self, user, other_user):
+        quizzes = []
+        for i in range(3):
+            quiz = Quiz.objects.create(user=user, title=f"Quiz {i}", video_url=f"https://example.com/{i}")
+            Question.objects.create(quiz=quiz, question_title="Q?", question_options=["A", "B", "C", "D"], answer="B")
+            quizzes.append(quiz)
+        Quiz.objects.create(user=other_user, title="Foreign", video_url="https://example.com/x")
+        return quizzes
+
+    def test_list_matches_sync_endpoint(self, async_client, auth_client, quizzes):
+        response = get(async_client, reverse("async-quiz-list"), data={"page_size": 2})
+        sync_response = auth_client.get(reverse("quiz-list"), {"page_size": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["results"] == json.loads(sync_response.content)["results"]
+        assert [quiz["title"] for quiz in body["results"]] == ["Quiz 2", "Quiz 1"]
+
+        next_page = get(async_client, body["next"]).json()
+        assert [quiz["title"] for quiz in next_page["results"]] == ["Quiz 0"]
+        assert next_page["next"] is None
+
+    def test_detail_matches_sync_endpoint_and_supports_etag(self, async_client, auth_client, quizzes):
+        url = reverse("async-quiz-detail", args=[quizzes[0].pk])
+        response = get(async_client, url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == auth_client.get(reverse("quiz-detail", args=[quizzes[0].pk])).content
+
+        response = get(async_client, url, headers={"If-None-Match": response["ETag"]})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_detail_of_foreign_quiz_is_not_found(self, async_client, other_user):
+        quiz = Quiz.objects.create(user=other_user, title="Foreign", video_url="https://example.com/x")
+
+        response = get(async_client, reverse("async-quiz-detail", args=[quiz.pk]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_requires_authentication(self):
+        response = get(AsyncClient(), reverse("async-quiz-list"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_create_runs_pipeline_with_async_gemini_client(self, async_client, monkeypatch):
+        Transcript.objects.create(video_id=VIDEO_ID, title="Video Title", text="cached transcript", audio_checksum="x")
+        client = FakeGeminiClient(responder=lambda contents: generated_questions_json())
+        monkeypatch.setattr("quizly_app.async_utils.get_async_gemini_client", lambda: client)
+
+        response = async_to_sync(async_client.post)(
+            reverse("async-quiz-list"),
+            {"url": f"https://www.youtube.com/watch?v={VIDEO_ID}"},
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        body = response.json()
+        assert body["status"] == QuizJob.Status.DONE
+        assert len(body["quiz"]["questions"]) == 10
+        assert response["Location"] == reverse("quiz-job-detail", args=[body["id"]])
+        assert len(client.calls) == 1
+
+    def test_create_rejects_invalid_url(self, async_client):
+        response = async_to_sync(async_client.post)(
+            reverse("async-quiz-list"),
+            {"url": "not a url"},
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -2,44 +2,53 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from unittest.mock import patch
-from quizly_app.models import Quiz
+from quizly_app.jobs import process_pending_jobs
+from quizly_app.models import Quiz, QuizJob
+
+
+def generated_quiz_data():
+    return {
+        "title": "My Test Quiz",
+        "description": "A test description",
+        "questions": [
+            {
+                "question_title": f"Question {i}?",
+                "question_options": [
+                    f"Option A{i}",
+                    f"Option B{i}",
+                    f"Option C{i}",
+                    f"Option D{i}",
+                ],
+                "answer": "A",
+            }
+            for i in range(1, 11)
+        ],
+    }
 
 
 @pytest.mark.django_db
 class TestCreateQuiz:
 
-    @patch("quizly_app.views.generate_quiz_from_youtube")
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
     def test_create_quiz_success(self, mock_gen, auth_client, user):
-        mock_gen.return_value = {
-            "title": "My Test Quiz",
-            "description": "A test description",
-            "questions": [
-                {
-                    "question_title": f"Question {i}?",
-                    "question_options": [
-                        f"Option A{i}",
-                        f"Option B{i}",
-                        f"Option C{i}",
-                        f"Option D{i}",
-                    ],
-                    "answer": "A",
-                }
-                for i in range(1, 11)
-            ],
-        }
+        mock_gen.return_value = generated_quiz_data()
 
         url = reverse("quiz-list")
         data = {"url": "https://youtube.com/watch?v=123"}
 
         response = auth_client.post(url, data, format="json")
 
-        assert response.status_code == status.HTTP_201_CREATED
-        assert response.data["title"] == "My Test Quiz"
-        assert response.data["description"] == "A test description"
-        assert response.data["video_url"] == data["url"]
-        assert len(response.data["questions"]) == 10
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == QuizJob.Status.DONE
+        assert response["Location"] == reverse("quiz-job-detail", args=[response.data["id"]])
+
+        quiz_data = response.data["quiz"]
+        assert quiz_data["title"] == "My Test Quiz"
+        assert quiz_data["description"] == "A test description"
+        assert quiz_data["video_url"] == data["url"]
+        assert len(quiz_data["questions"]) == 10
 
-        for question in response.data["questions"]:
+        for question in quiz_data["questions"]:
             assert len(question["question_options"]) == 4
 
         quiz = Quiz.objects.get(user=user)
@@ -49,7 +58,17 @@ class TestCreateQuiz:
         assert quiz.questions.count() == 10
 
 
-    @patch("quizly_app.views.generate_quiz_from_youtube")
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_job_questions_are_ordered(self, mock_gen, auth_client):
+        mock_gen.return_value = generated_quiz_data()
+        location = auth_client.post(reverse("quiz-list"), {"url": "https://youtube.com/watch?v=123"}, format="json")["Location"]
+
+        response = auth_client.get(location)
+
+        ids = [question["id"] for question in response.data["quiz"]["questions"]]
+        assert ids == sorted(ids)
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
     def test_create_quiz_generator_error(self, mock_gen, auth_client):
         mock_gen.side_effect = ValueError("Could not transcribe audio")
 
@@ -58,8 +77,46 @@ class TestCreateQuiz:
 
         response = auth_client.post(url, data, format="json")
 
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == QuizJob.Status.FAILED
         assert response.data["error"] == "Could not transcribe audio"
+        assert Quiz.objects.count() == 0
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_create_quiz_returns_before_generation(self, mock_gen, settings, auth_client, user):
+        settings.QUIZ_JOBS_EAGER = False
+        mock_gen.return_value = generated_quiz_data()
+
+        response = auth_client.post(
+            reverse("quiz-list"),
+            {"url": "https://youtube.com/watch?v=123"},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == QuizJob.Status.PENDING
+        assert response.data["quiz"] is None
+        mock_gen.assert_not_called()
+
+        assert process_pending_jobs() == 1
+
+        status_response = auth_client.get(response["Location"])
+        assert status_response.status_code == status.HTTP_200_OK
+        assert status_response.data["status"] == QuizJob.Status.DONE
+        assert status_response.data["quiz"]["title"] == "My Test Quiz"
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_job_status_of_other_user_hidden(self, mock_gen, auth_client, other_auth_client):
+        mock_gen.return_value = generated_quiz_data()
+
+        response = auth_client.post(
+            reverse("quiz-list"),
+            {"url": "https://youtube.com/watch?v=123"},
+            format="json",
+        )
+
+        other_response = other_auth_client.get(response["Location"])
+        assert other_response.status_code == status.HTTP_404_NOT_FOUND
 
     def test_create_quiz_requires_auth(self, client):
         url = reverse("quiz-list")
@@ -72,4 +129,4 @@ class TestCreateQuiz:
         assert response.status_code in [
             status.HTTP_401_UNAUTHORIZED,
             status.HTTP_403_FORBIDDEN,
-        ]
\ No newline at end of file
+        ]
@@ -0,0 +1,62 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from core.db_routers import PrimaryReplicaRouter, replica_reads
+from quizly_app.models import Quiz, Question
+
+User = get_user_model()
+
+
+@pytest.fixture
+def router(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    return PrimaryReplicaRouter()
+
+
+def test_quiz_reads_use_replica_only_when_allowed(router):
+    assert router.db_for_read(Quiz) == "default"
+
+    with replica_reads():
+        assert router.db_for_read(Quiz) == "replica"
+        assert router.db_for_read(Question) == "replica"
+
+    assert router.db_for_read(Quiz) == "default"
+
+
+def test_writes_and_other_apps_use_primary(router):
+    with replica_reads():
+        assert router.db_for_write(Quiz) == "default"
+        assert router.db_for_read(User) == "default"
+
+
+@pytest.mark.django_db
+def test_reads_inside_transactions_use_primary(router):
+    with replica_reads(), transaction.atomic():
+        assert router.db_for_read(Quiz) == "default"
+
+
+def test_without_replicas_everything_uses_primary(router, settings):
+    settings.DATABASE_REPLICAS = []
+
+    with replica_reads():
+        assert router.db_for_read(Quiz) == "default"
+
+
+@pytest.mark.django_db
+def test_quiz_detail_is_filled_from_primary(router, auth_client, user, monkeypatch):
+    from quizly_app import views
+
+    quiz = Quiz.objects.create(user=user, title="Fresh", video_url="https://example.com")
+    databases = []
+
+    def detail_data(quiz_id, request_user):
+        databases.append(router.db_for_read(Quiz))
+        return real_detail_data(quiz_id, request_user)
+
+    real_detail_data = views.quiz_detail_data
+    monkeypatch.setattr(views, "quiz_detail_data", detail_data)
+
+    response = auth_client.get(f"/api/quizzes/{quiz.pk}/")
+
+    assert response.status_code == 200
+    assert databases == ["default"]
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import pytest
+from quizly_app.utils import get_async_gemini_client, get_gemini_client
+from .fakes import FakeGeminiClient
+
+
+@pytest.fixture(autouse=True)
+def fake_factory(settings):
+    settings.GEMINI_CLIENT_FACTORY = "quizly_app.tests.fakes.FakeGeminiClient"
+
+
+def test_client_is_reused_within_process():
+    client = get_gemini_client()
+
+    assert isinstance(client, FakeGeminiClient)
+    assert get_gemini_client() is client
+
+
+def test_settings_change_builds_new_client(settings):
+    client = get_gemini_client()
+    settings.GEMINI_API_KEY = "another-key"
+
+    assert get_gemini_client() is not client
+
+
+def test_forked_child_builds_its_own_client():
+    parent_client = get_gemini_client()
+    read_end, write_end = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        reused = get_gemini_client() is parent_client
+        os.write(write_end, b"reused" if reused else b"fresh")
+        os._exit(0)
+
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 16) == b"fresh"
+    assert get_gemini_client() is parent_client
+
+
+def test_real_client_keeps_connections_alive(settings):
+    pytest.importorskip("google.genai")
+    settings.GEMINI_CLIENT_FACTORY = None
+    settings.GEMINI_API_KEY = "test-key"
+
+    client = get_gemini_client()
+
+    assert get_gemini_client() is client
+    assert client._api_client._http_options.client_args["limits"].max_keepalive_connections > 0
+
+
+def test_async_client_is_per_event_loop():
+    async def clients():
+        return get_async_gemini_client(), get_async_gemini_client()
+
+    first, same = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+
+    assert first is same
+    assert first is not second
@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+import pytest
+from unittest.mock import patch
+from django.utils import timezone
+from quizly_app.jobs import claim_next_job, create_coalesced_job, requeue_stale_jobs, run_quiz_job
+from quizly_app.models import Quiz, QuizJob
+from .test_create_quiz import generated_quiz_data
+
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def running_job(user):
+    create_coalesced_job(user, VIDEO_URL)
+    return claim_next_job()
+
+
+@pytest.mark.django_db
+class TestJobClaims:
+
+    def test_claim_sets_token_and_heartbeat(self, running_job):
+        assert running_job.status == QuizJob.Status.RUNNING
+        assert len(running_job.claim_token) == 32
+        assert running_job.heartbeat_at is not None
+
+    def test_long_running_job_with_heartbeat_is_not_requeued(self, running_job):
+        QuizJob.objects.filter(pk=running_job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+
+        assert requeue_stale_jobs() == 0
+
+    def test_job_with_missed_heartbeat_is_requeued(self, running_job):
+        QuizJob.objects.filter(pk=running_job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+
+        assert requeue_stale_jobs() == 1
+        running_job.refresh_from_db()
+        assert running_job.status == QuizJob.Status.PENDING
+        assert running_job.claim_token == ""
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_worker_that_lost_its_claim_discards_result(self, mock_gen, running_job):
+        mock_gen.return_value = generated_quiz_data()
+        QuizJob.objects.filter(pk=running_job.pk).update(claim_token="another-worker")
+
+        run_quiz_job(running_job)
+
+        assert not Quiz.objects.exists()
+        row = QuizJob.objects.get(pk=running_job.pk)
+        assert row.status == QuizJob.Status.RUNNING
+        assert row.claim_token == "another-worker"
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("quizly_app.jobs.generate_quiz_from_youtube")
+def test_heartbeat_is_refreshed_while_running(mock_gen, running_job, settings):
+    settings.QUIZ_JOB_HEARTBEAT_INTERVAL = 0.05
+    beats = []
+
+    def slow_pipeline(url):
+        time.sleep(0.3)
+        beats.append(QuizJob.objects.get(pk=running_job.pk).heartbeat_at)
+        return generated_quiz_data()
+
+    mock_gen.side_effect = slow_pipeline
+
+    run_quiz_job(running_job)
+
+    assert beats[0] > running_job.heartbeat_at
+    assert QuizJob.objects.get(pk=running_job.pk).status == QuizJob.Status.DONE
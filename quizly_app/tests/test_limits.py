@@ -0,0 +1,125 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from quizly_app.limits import StageBusy, _try_lock_file, _unlock_file, StageLimiter, TokenBucket, stage_limit
+from quizly_app.models import QuizJob
+
+
+@pytest.fixture(autouse=True)
+def lock_dir(settings, tmp_path):
+    settings.STAGE_LOCK_DIR = str(tmp_path)
+    return tmp_path
+
+
+class TestStageLimiter:
+
+    def test_slots_are_exclusive(self):
+        limiter = StageLimiter("download", 2)
+
+        first = limiter.try_acquire()
+        second = limiter.try_acquire()
+
+        assert first and second and first[0] != second[0]
+        assert limiter.try_acquire() is None
+
+        limiter.release(first)
+        third = limiter.try_acquire()
+        assert third is not None
+
+        limiter.release(second)
+        limiter.release(third)
+
+    def test_slots_are_shared_with_other_processes(self, lock_dir):
+        holder = subprocess.Popen(
+            [sys.executable, "-c", (
+                "import fcntl, sys, time\n"
+                f"handle = open({str(lock_dir / 'download.0.lock')!r}, 'a+')\n"
+                "fcntl.flock(handle, fcntl.LOCK_EX)\n"
+                "print('locked', flush=True)\n"
+                "time.sleep(30)\n"
+            )],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert holder.stdout.readline().strip() == "locked"
+            assert StageLimiter("download", 1).try_acquire() is None
+        finally:
+            holder.kill()
+            holder.wait()
+
+        limiter = StageLimiter("download", 1)
+        slot = limiter.try_acquire()
+        assert slot is not None
+        limiter.release(slot)
+
+    def test_waiting_too_long_raises(self, settings):
+        settings.STAGE_CONCURRENCY = {"gemini": 1}
+        settings.STAGE_WAIT_TIMEOUT = 0
+
+        with stage_limit("gemini"):
+            with pytest.raises(StageBusy):
+                with stage_limit("gemini"):
+                    pass
+
+        with stage_limit("gemini"):
+            pass
+
+
+def test_token_bucket_allows_burst_then_asks_to_wait():
+    bucket = TokenBucket("test", rate=1, capacity=2)
+
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert 0 < bucket.take() <= 1
+
+
+
+def test_waiting_for_bucket_lock_does_not_block_event_loop(lock_dir):
+    bucket = TokenBucket("test", rate=1, capacity=2)
+    path = lock_dir / "test.bucket"
+    handle = _try_lock_file(path)
+    threading.Timer(0.3, _unlock_file, args=[path, handle]).start()
+    ticks = []
+
+    async def main():
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await bucket.await_token()
+        task.cancel()
+
+    asyncio.run(main())
+
+    assert len(ticks) > 5
+
+@pytest.mark.django_db
+class TestQueueBackpressure:
+
+    @pytest.fixture(autouse=True)
+    def small_queue(self, settings):
+        settings.QUIZ_QUEUE_MAX_ACTIVE = 1
+        settings.QUIZ_QUEUE_RETRY_AFTER = 12
+
+    def test_full_queue_returns_429(self, auth_client, other_user):
+        QuizJob.objects.create(user=other_user, video_url="https://youtu.be/aaaaaaaaaaa", video_key="youtube:aaaaaaaaaaa")
+
+        response = auth_client.post(reverse("quiz-list"), {"url": "https://youtu.be/bbbbbbbbbbb"}, format="json")
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["Retry-After"] == "12"
+        assert QuizJob.objects.count() == 1
+
+    def test_requests_for_in_flight_video_are_accepted(self, auth_client, other_user):
+        QuizJob.objects.create(user=other_user, video_url="https://youtu.be/aaaaaaaaaaa", video_key="youtube:aaaaaaaaaaa")
+
+        response = auth_client.post(reverse("quiz-list"), {"url": "https://www.youtube.com/watch?v=aaaaaaaaaaa"}, format="json")
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
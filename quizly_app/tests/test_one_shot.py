@@ -0,0 +1,77 @@
+import json
+import pytest
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from quizly_app import utils
+from quizly_app.async_utils import agenerate_quiz_from_youtube
+from quizly_app.models import Transcript
+from quizly_app.utils import generate_quiz_from_youtube
+from .fakes import FakeGeminiClient
+
+
+VIDEO_ID = "dQw4w9WgXcQ"
+URL = f"https://youtu.be/{VIDEO_ID}"
+
+
+def respond(contents):
+    if isinstance(contents, list) and contents[0] == utils.build_transcription_prompt():
+        return "two-stage transcript"
+    return json.dumps([
+        {"question": f"Question {i}?", "options": ["Paris", "London", "Berlin", "Rome"], "answer": "B"}
+        for i in range(10)
+    ])
+
+
+@pytest.fixture
+def gemini(settings, monkeypatch):
+    settings.AUDIO_STREAMING = True
+    settings.QUIZ_ONE_SHOT = True
+    settings.QUIZ_ONE_SHOT_MAX_BYTES = 100
+    client = FakeGeminiClient(responder=respond)
+    monkeypatch.setattr("quizly_app.utils.get_gemini_client", lambda: client)
+    monkeypatch.setattr("quizly_app.async_utils.get_async_gemini_client", lambda: client)
+    return client
+
+
+@pytest.mark.django_db
+@patch("quizly_app.utils.stream_audio_from_youtube", return_value=(b"short audio", "Video Title", "audio/ogg"))
+class TestOneShotQuiz:
+
+    def test_short_audio_uses_single_call_with_schema(self, mock_stream, gemini):
+        data = generate_quiz_from_youtube(URL)
+
+        assert data["title"] == "Video Title"
+        assert len(data["questions"]) == 10
+        assert len(gemini.calls) == 1
+        call = gemini.calls[0]
+        assert call["contents"][1].inline_data.data == b"short audio"
+        assert call["config"].response_schema.max_items == 10
+        assert not Transcript.objects.exists()
+
+    def test_long_audio_falls_back_to_two_stages(self, mock_stream, gemini, settings):
+        settings.QUIZ_ONE_SHOT_MAX_BYTES = 5
+
+        data = generate_quiz_from_youtube(URL)
+
+        assert len(data["questions"]) == 10
+        assert len(gemini.calls) == 2
+        assert mock_stream.call_count == 1
+        assert Transcript.objects.get(video_id=VIDEO_ID).text == "two-stage transcript"
+
+    def test_cached_transcript_skips_download(self, mock_stream, gemini):
+        Transcript.objects.create(video_id=VIDEO_ID, title="Cached", text="cached transcript", audio_checksum="x")
+
+        data = generate_quiz_from_youtube(URL)
+
+        assert data["title"] == "Cached"
+        mock_stream.assert_not_called()
+        assert gemini.calls[0]["contents"] == utils.build_question_prompt("cached transcript", "Cached")
+
+    def test_async_pipeline_uses_single_call(self, mock_stream, gemini, monkeypatch):
+        monkeypatch.setattr("quizly_app.async_utils.stream_audio_from_youtube", mock_stream)
+
+        data = async_to_sync(agenerate_quiz_from_youtube)(URL)
+
+        assert len(data["questions"]) == 10
+        assert len(gemini.calls) == 1
+        assert gemini.calls[0]["config"].response_schema is not None
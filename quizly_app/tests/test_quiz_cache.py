@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import patch
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from quizly_app.cache import get_cached_quiz_detail
+from quizly_app.models import Quiz, Question
+
+
+@pytest.mark.django_db
+class TestQuizDetailCache:
+
+    @pytest.fixture
+    def quiz(self, user):
+        quiz = Quiz.objects.create(user=user, title="Cached", video_url="https://example.com")
+        Question.objects.create(
+            quiz=quiz,
+            question_title="Capital of France?",
+            question_options=["Paris", "London", "Berlin", "Rome"],
+            answer="A",
+        )
+        return quiz
+
+    @pytest.fixture
+    def forced_client(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_second_request_skips_the_database(self, forced_client, quiz):
+        url = reverse("quiz-detail", args=[quiz.id])
+        first = forced_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = forced_client.get(url)
+
+        assert len(queries.captured_queries) == 0
+        assert second.content == first.content
+        assert second.data["questions"][0]["answer"] == "Paris"
+
+    def test_if_none_match_returns_304(self, forced_client, quiz):
+        url = reverse("quiz-detail", args=[quiz.id])
+        etag = forced_client.get(url)["ETag"]
+
+        response = forced_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response["ETag"] == etag
+
+    def test_patch_invalidates_cache(self, forced_client, quiz, django_capture_on_commit_callbacks):
+        url = reverse("quiz-detail", args=[quiz.id])
+        etag = forced_client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            forced_client.patch(url, {"title": "Renamed"}, format="json")
+        response = forced_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["title"] == "Renamed"
+        assert response["ETag"] != etag
+
+    def test_question_change_invalidates_cache(self, forced_client, quiz, django_capture_on_commit_callbacks):
+        url = reverse("quiz-detail", args=[quiz.id])
+        forced_client.get(url)
+
+        question = quiz.questions.get()
+        question.answer = "B"
+        with django_capture_on_commit_callbacks(execute=True):
+            question.save()
+
+        assert forced_client.get(url).data["questions"][0]["answer"] == "London"
+
+    def test_cached_quiz_of_other_user_is_hidden(self, forced_client, other_user, quiz):
+        url = reverse("quiz-detail", args=[quiz.id])
+        forced_client.get(url)
+
+        other_client = APIClient()
+        other_client.force_authenticate(user=other_user)
+
+        assert other_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_delete_invalidates_cache(self, forced_client, quiz, django_capture_on_commit_callbacks):
+        url = reverse("quiz-detail", args=[quiz.id])
+        forced_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            forced_client.delete(url)
+
+        assert forced_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cache_is_cleared_only_after_commit(self, forced_client, quiz, django_capture_on_commit_callbacks):
+        forced_client.get(reverse("quiz-detail", args=[quiz.id]))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            quiz.title = "Renamed"
+            quiz.save()
+            assert get_cached_quiz_detail(quiz.id) is not None
+
+        assert get_cached_quiz_detail(quiz.id) is None
+
+    def test_edit_from_another_worker_clears_shared_cache(
+        self, forced_client, quiz, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)},
+        }
+        url = reverse("quiz-detail", args=[quiz.id])
+        forced_client.get(url)
+
+        other_worker_cache = FileBasedCache(str(tmp_path), {})
+        with patch("quizly_app.cache.cache", other_worker_cache), django_capture_on_commit_callbacks(execute=True):
+            quiz.title = "Renamed"
+            quiz.save()
+
+        assert forced_client.get(url).data["title"] == "Renamed"
@@ -1,8 +1,10 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from quizly_app.models import Quiz
+from quizly_app.models import Quiz, Question
+from quizly_app.serializers import QuizSerializer, quiz_detail_data
 from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 User = get_user_model()
@@ -55,6 +57,27 @@ class TestQuizDetail:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["title"] == "Original Title"
 
+    def test_fast_path_matches_serializer_output(self, auth_client, user, quiz):
+        for answer in ["A", "d", "", "E"]:
+            Question.objects.create(
+                quiz=quiz,
+                question_title=f"Answer {answer}?",
+                question_options=["Paris", "London", "Berlin", "Rome"],
+                answer=answer,
+            )
+
+        expected = JSONRenderer().render(QuizSerializer(Quiz.objects.get(pk=quiz.pk)).data)
+
+        assert JSONRenderer().render(quiz_detail_data(quiz.id, user)) == expected
+
+        response = auth_client.get(reverse("quiz-detail", args=[quiz.id]), HTTP_ACCEPT="application/json")
+        assert response.content == expected
+
+    def test_get_missing_quiz(self, auth_client):
+        response = auth_client.get(reverse("quiz-detail", args=[999999]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_get_other_users_quiz_denied(self, other_auth_client, quiz):
         url = reverse("quiz-detail", args=[quiz.id])
         response = other_auth_client.get(url)
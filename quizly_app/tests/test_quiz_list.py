@@ -1,7 +1,9 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from quizly_app.models import Quiz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from quizly_app.models import Quiz, Question
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 
@@ -44,12 +46,115 @@ class TestQuizList:
         response = auth_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        titles = [q["title"] for q in response.data]
+        titles = [q["title"] for q in response.data["results"]]
 
         assert "Q1" in titles
         assert "Q2" in titles
         assert "Foreign Q" not in titles
 
+    def create_quizzes(self, user, count):
+        for i in range(count):
+            quiz = Quiz.objects.create(user=user, title=f"Quiz {i}", video_url=f"https://example.com/{i}")
+            Question.objects.bulk_create([
+                Question(
+                    quiz=quiz,
+                    question_title=f"Question {j}?",
+                    question_options=["A", "B", "C", "D"],
+                    answer="A",
+                )
+                for j in range(3)
+            ])
+
+    def count_list_queries(self, auth_client, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(reverse("quiz-list"), params)
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries.captured_queries)
+
+    def test_list_query_count_is_constant(self, auth_client, user):
+        self.create_quizzes(user, 1)
+        queries_for_one = self.count_list_queries(auth_client, {"expand": "questions"})
+        summary_queries_for_one = self.count_list_queries(auth_client)
+
+        self.create_quizzes(user, 9)
+        queries_for_ten = self.count_list_queries(auth_client, {"expand": "questions"})
+        summary_queries_for_ten = self.count_list_queries(auth_client)
+
+        assert queries_for_one == queries_for_ten == 2
+        assert summary_queries_for_one == summary_queries_for_ten == 1
+
+    def test_list_is_paginated_newest_first(self, auth_client, user):
+        self.create_quizzes(user, 5)
+
+        response = auth_client.get(reverse("quiz-list"), {"page_size": 2})
+        pages = [response.data["results"]]
+        while response.data["next"]:
+            response = auth_client.get(response.data["next"])
+            pages.append(response.data["results"])
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        titles = [quiz["title"] for page in pages for quiz in page]
+        assert titles == ["Quiz 4", "Quiz 3", "Quiz 2", "Quiz 1", "Quiz 0"]
+
+    def test_pagination_breaks_created_at_ties_by_id(self, auth_client, user):
+        self.create_quizzes(user, 4)
+        Quiz.objects.filter(user=user).update(created_at=Quiz.objects.first().created_at)
+
+        response = auth_client.get(reverse("quiz-list"), {"page_size": 3})
+        first_page = [quiz["id"] for quiz in response.data["results"]]
+        second_page = [quiz["id"] for quiz in auth_client.get(response.data["next"]).data["results"]]
+
+        ids = first_page + second_page
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 4
+
+    def test_list_returns_summaries(self, auth_client, user):
+        self.create_quizzes(user, 2)
+
+        response = auth_client.get(reverse("quiz-list"))
+
+        quiz = response.data["results"][0]
+        assert set(quiz) == {"id", "title", "description", "created_at", "question_count"}
+        assert quiz["question_count"] == 3
+
+    def test_list_expand_questions_returns_full_quizzes(self, auth_client, user):
+        self.create_quizzes(user, 1)
+
+        response = auth_client.get(reverse("quiz-list"), {"expand": "questions"})
+
+        quiz = response.data["results"][0]
+        assert len(quiz["questions"]) == 3
+        assert "video_url" in quiz
+
+    def test_sparse_fieldset(self, auth_client, user):
+        self.create_quizzes(user, 1)
+
+        response = auth_client.get(reverse("quiz-list"), {"fields": "id,title"})
+        assert set(response.data["results"][0]) == {"id", "title"}
+
+        response = auth_client.get(reverse("quiz-list"), {"fields": "id,questions", "expand": "questions"})
+        assert set(response.data["results"][0]) == {"id", "questions"}
+
+    def test_unpaginated_list_is_still_available(self, auth_client, sample_quizzes):
+        response = auth_client.get(reverse("quiz-list"), {"paginate": "false"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert isinstance(response.data, list)
+        assert {quiz["title"] for quiz in response.data} == {"Q1", "Q2"}
+
+    def test_invalid_cursor(self, auth_client, sample_quizzes):
+        response = auth_client.get(reverse("quiz-list"), {"cursor": "not-a-cursor"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_questions_are_ordered(self, auth_client, user):
+        self.create_quizzes(user, 1)
+
+        response = auth_client.get(reverse("quiz-list"), {"expand": "questions"})
+
+        ids = [question["id"] for question in response.data["results"][0]["questions"]]
+        assert ids == sorted(ids)
+
     def test_list_requires_auth(self, client):
         url = reverse("quiz-list")
         response = client.get(url)
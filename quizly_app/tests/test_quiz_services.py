@@ -0,0 +1,69 @@
+import json
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from quizly_app.models import Quiz, Question
+from quizly_app.services import create_quiz_with_questions
+from .test_create_quiz import generated_quiz_data
+
+
+@pytest.mark.django_db
+class TestCreateQuizWithQuestions:
+
+    def test_questions_are_inserted_in_one_statement(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            quiz = create_quiz_with_questions(user, "https://youtu.be/dQw4w9WgXcQ", generated_quiz_data())
+
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 2
+        assert quiz.questions.count() == 10
+        assert all(question.created_at for question in quiz.questions.all())
+
+    def test_failure_rolls_back_the_quiz(self, user):
+        data = generated_quiz_data()
+        data["questions"][5]["question_options"] = None
+
+        with pytest.raises(Exception):
+            create_quiz_with_questions(user, "https://youtu.be/dQw4w9WgXcQ", data)
+
+        assert Quiz.objects.count() == 0
+        assert Question.objects.count() == 0
+
+    def test_import_command_uses_service(self, user, tmp_path):
+        entry = generated_quiz_data()
+        entry["video_url"] = "https://youtu.be/dQw4w9WgXcQ"
+        path = tmp_path / "quizzes.json"
+        path.write_text(json.dumps([entry, entry]))
+
+        call_command("import_quizzes", str(path), user=user.email)
+
+        assert Quiz.objects.filter(user=user).count() == 2
+        assert Question.objects.count() == 20
+
+    def test_import_writes_all_quizzes_in_two_statements(self, user, tmp_path):
+        entry = generated_quiz_data()
+        entry["video_url"] = "https://youtu.be/dQw4w9WgXcQ"
+        path = tmp_path / "quizzes.json"
+        path.write_text(json.dumps([entry] * 3))
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("import_quizzes", str(path), user=user.email)
+
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 2
+        assert Question.objects.count() == 30
+
+    def test_invalid_entry_imports_nothing(self, user, tmp_path):
+        good = generated_quiz_data()
+        good["video_url"] = "https://youtu.be/dQw4w9WgXcQ"
+        bad = generated_quiz_data()
+        bad["video_url"] = "https://youtu.be/dQw4w9WgXcQ"
+        bad["questions"][3]["answer"] = "E"
+        path = tmp_path / "quizzes.json"
+        path.write_text(json.dumps([good, bad]))
+
+        with pytest.raises(CommandError, match="Entry 2"):
+            call_command("import_quizzes", str(path), user=user.email)
+
+        assert Quiz.objects.count() == 0
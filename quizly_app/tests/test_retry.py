@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+import time
+import pytest
+from quizly_app.limits import StageLimiter
+from quizly_app.retry import RetryPolicy, acall_with_retry, call_with_retry, is_retryable
+from quizly_app.utils import generate_questions_with_gemini
+from .fakes import FakeGeminiClient
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def questions_json(count=10):
+    return json.dumps([
+        {"question": f"Question {i}?", "options": ["Paris", "London", "Berlin", "Rome"], "answer": "A"}
+        for i in range(count)
+    ])
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(settings):
+    settings.GEMINI_RETRY_BASE_DELAY = 0
+    settings.GEMINI_HEDGING = False
+
+
+def failing_then(results):
+    """Return a callable that raises/returns the given results in order."""
+    results = list(results)
+
+    def call():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return call
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (FakeAPIError(429), True),
+    (FakeAPIError(503), True),
+    (FakeAPIError(400), False),
+    (TimeoutError(), True),
+    (ValueError("Could not download audio"), False),
+])
+def test_is_retryable(exc, expected):
+    assert is_retryable(exc) is expected
+
+
+def test_transient_errors_are_retried():
+    call = failing_then([FakeAPIError(503), FakeAPIError(429), "ok"])
+
+    assert call_with_retry(call, "test") == "ok"
+
+
+def test_permanent_errors_are_not_retried():
+    call = failing_then([FakeAPIError(400), "ok"])
+
+    with pytest.raises(FakeAPIError):
+        call_with_retry(call, "test")
+
+
+def test_gives_up_after_max_attempts():
+    call = failing_then([FakeAPIError(503)] * 3 + ["ok"])
+
+    with pytest.raises(FakeAPIError):
+        call_with_retry(call, "test", RetryPolicy(attempts=3, base_delay=0))
+
+
+def test_attempt_timeout():
+    policy = RetryPolicy(attempts=2, base_delay=0, attempt_timeout=0.1)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        call_with_retry(lambda: time.sleep(1), "test", policy)
+
+    assert time.monotonic() - started < 0.9
+
+
+def test_waiting_for_a_slot_does_not_leave_abandoned_calls(settings, tmp_path):
+    settings.STAGE_LOCK_DIR = str(tmp_path)
+    settings.STAGE_CONCURRENCY = {"gemini": 1}
+    limiter = StageLimiter("gemini", 1)
+    slot = limiter.try_acquire()
+    threading.Timer(0.3, limiter.release, args=[slot]).start()
+    calls = []
+
+    policy = RetryPolicy(attempts=2, base_delay=0, attempt_timeout=0.1)
+    assert call_with_retry(lambda: calls.append(1) or "ok", "slot-test", policy) == "ok"
+
+    time.sleep(0.3)
+    assert calls == [1]
+
+
+def test_timed_out_attempt_makes_no_further_call():
+    calls = []
+
+    def call():
+        calls.append(time.monotonic())
+        time.sleep(0.3)
+
+    policy = RetryPolicy(attempts=1, base_delay=0, attempt_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        call_with_retry(call, "timeout-test", policy)
+
+    time.sleep(0.5)
+    assert len(calls) == 1
+
+
+def test_hedged_request_wins_over_slow_one():
+    delays = [1.0, 0.0]
+
+    def call():
+        delay = delays.pop(0)
+        time.sleep(delay)
+        return delay
+
+    policy = RetryPolicy(attempts=1, hedge=True, hedge_after=0.05)
+
+    started = time.monotonic()
+    assert call_with_retry(call, "hedge-test", policy) == 0.0
+    assert time.monotonic() - started < 0.5
+
+
+def test_async_hedged_request_wins_and_loser_is_cancelled():
+    cancelled = []
+    delays = [1.0, 0.0]
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    policy = RetryPolicy(attempts=1, hedge=True, hedge_after=0.05)
+
+    assert asyncio.run(acall_with_retry(call, "async-hedge-test", policy)) == 0.0
+    assert cancelled == [1.0]
+
+
+def test_async_wait_for_a_slot_is_not_timed_and_full_limiter_prevents_hedge(settings, tmp_path):
+    settings.STAGE_LOCK_DIR = str(tmp_path)
+    settings.STAGE_CONCURRENCY = {"gemini": 1}
+    limiter = StageLimiter("gemini", 1)
+    slot = limiter.try_acquire()
+    threading.Timer(0.3, limiter.release, args=[slot]).start()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "ok"
+
+    policy = RetryPolicy(attempts=1, attempt_timeout=0.5, hedge=True, hedge_after=0.05)
+    assert asyncio.run(acall_with_retry(call, "async-slot-test", policy)) == "ok"
+
+    assert calls == [1]
+    assert limiter.try_acquire() is not None
+
+
+def test_invalid_questions_are_regenerated_from_same_transcript():
+    answers = ["not json", questions_json(count=9), questions_json()]
+    client = FakeGeminiClient(responder=lambda contents: answers.pop(0))
+
+    data = generate_questions_with_gemini("the transcript", "Title", client=client)
+
+    assert len(data["questions"]) == 10
+    assert len(client.calls) == 3
+    assert all("the transcript" in call["contents"] for call in client.calls)
@@ -0,0 +1,82 @@
+import pytest
+from unittest.mock import patch
+from quizly_app.jobs import claim_job, create_coalesced_job, enqueue_quiz_job, process_pending_jobs, run_quiz_job
+from quizly_app.models import Quiz, QuizJob
+from .test_create_quiz import generated_quiz_data
+
+
+@pytest.mark.django_db
+class TestSingleFlight:
+
+    @pytest.fixture(autouse=True)
+    def queued_mode(self, settings):
+        settings.QUIZ_JOBS_EAGER = False
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_concurrent_requests_share_one_pipeline(self, mock_gen, user, other_user):
+        mock_gen.return_value = generated_quiz_data()
+
+        leader = enqueue_quiz_job(user, "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        follower = enqueue_quiz_job(other_user, "https://youtu.be/dQw4w9WgXcQ?t=30")
+        second = enqueue_quiz_job(user, "https://www.youtube.com/shorts/dQw4w9WgXcQ")
+
+        assert leader.is_leader
+        assert follower.leader_id == leader.id
+        assert second.leader_id == leader.id
+
+        # The leader finishes its followers itself.
+        assert process_pending_jobs() == 1
+
+        mock_gen.assert_called_once()
+        assert QuizJob.objects.filter(status=QuizJob.Status.DONE).count() == 3
+        assert Quiz.objects.filter(user=user).count() == 2
+        assert Quiz.objects.filter(user=other_user).count() == 1
+
+        follower.refresh_from_db()
+        assert follower.quiz.questions.count() == 10
+        assert follower.quiz.video_url == "https://youtu.be/dQw4w9WgXcQ?t=30"
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_followers_share_leader_failure(self, mock_gen, user, other_user):
+        mock_gen.side_effect = ValueError("Could not download audio")
+
+        enqueue_quiz_job(user, "https://youtu.be/dQw4w9WgXcQ")
+        follower = enqueue_quiz_job(other_user, "https://youtu.be/dQw4w9WgXcQ")
+
+        process_pending_jobs()
+
+        follower.refresh_from_db()
+        assert follower.status == QuizJob.Status.FAILED
+        assert follower.error == "Could not download audio"
+        mock_gen.assert_called_once()
+
+    @patch("quizly_app.jobs.generate_quiz_from_youtube")
+    def test_finished_video_starts_new_pipeline(self, mock_gen, user):
+        mock_gen.return_value = generated_quiz_data()
+
+        first = enqueue_quiz_job(user, "https://youtu.be/dQw4w9WgXcQ")
+        process_pending_jobs()
+        second = enqueue_quiz_job(user, "https://youtu.be/dQw4w9WgXcQ")
+
+        assert first.id != second.id
+        assert second.is_leader
+        assert second.leader is None
+
+
+@pytest.mark.django_db
+@patch("quizly_app.jobs.generate_quiz_from_youtube")
+def test_eager_follower_waits_for_its_leader(mock_gen, user, other_user):
+    mock_gen.return_value = generated_quiz_data()
+    leader = create_coalesced_job(user, "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    follower = enqueue_quiz_job(other_user, "https://youtu.be/dQw4w9WgXcQ")
+
+    assert follower.leader_id == leader.id
+    assert follower.status == QuizJob.Status.PENDING
+
+    run_quiz_job(claim_job(leader.pk))
+
+    follower.refresh_from_db()
+    assert follower.status == QuizJob.Status.DONE
+    assert follower.quiz.user == other_user
+    mock_gen.assert_called_once()
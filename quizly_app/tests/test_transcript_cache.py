@@ -0,0 +1,143 @@
+import json
+import os
+import socket
+import pytest
+from unittest.mock import patch
+from quizly_app.models import Transcript
+from quizly_app.utils import extract_youtube_video_id, file_checksum, generate_quiz_from_youtube
+
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://youtube.com/watch?v={VIDEO_ID}&t=42s",
+    f"https://m.youtube.com/watch?feature=share&v={VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?t=10",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+])
+def test_extract_video_id_variants(url):
+    assert extract_youtube_video_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=123",
+    "https://www.youtube.com/channel/abc",
+    "not a url",
+])
+def test_extract_video_id_rejects_other_urls(url):
+    assert extract_youtube_video_id(url) is None
+
+
+@pytest.mark.django_db
+class TestTranscriptCache:
+
+    questions = {"title": "T", "description": "D", "questions": []}
+
+    @patch("quizly_app.utils.generate_questions_with_gemini")
+    @patch("quizly_app.utils.transcribe_audio_with_gemini")
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    def test_cache_miss_transcribes_and_stores(self, mock_download, mock_transcribe, mock_questions, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio-bytes")
+        mock_download.return_value = (str(audio), "Video Title")
+        mock_transcribe.return_value = "hello world"
+        mock_questions.return_value = self.questions
+
+        generate_quiz_from_youtube(f"https://youtu.be/{VIDEO_ID}")
+
+        mock_transcribe.assert_called_once()
+        cached = Transcript.objects.get(video_id=VIDEO_ID)
+        assert cached.text == "hello world"
+        assert cached.title == "Video Title"
+        assert len(cached.audio_checksum) == 64
+
+    @patch("quizly_app.utils.generate_questions_with_gemini")
+    @patch("quizly_app.utils.transcribe_audio_with_gemini")
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    def test_cache_hit_skips_download_and_transcription(self, mock_download, mock_transcribe, mock_questions):
+        Transcript.objects.create(
+            video_id=VIDEO_ID,
+            title="Cached Title",
+            text="cached transcript",
+            audio_checksum="0" * 64,
+        )
+        mock_questions.return_value = self.questions
+
+        generate_quiz_from_youtube(f"https://www.youtube.com/watch?v={VIDEO_ID}&t=5s")
+
+        mock_download.assert_not_called()
+        mock_transcribe.assert_not_called()
+        mock_questions.assert_called_once_with("cached transcript", "Cached Title")
+
+    @patch("quizly_app.utils.generate_questions_with_gemini")
+    @patch("quizly_app.utils.transcribe_audio_with_gemini")
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    def test_checksum_hit_skips_transcription(self, mock_download, mock_transcribe, mock_questions, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"same audio")
+        mock_download.return_value = (str(audio), "Mirror Upload")
+        mock_questions.return_value = self.questions
+
+        Transcript.objects.create(title="Original", text="known text", audio_checksum=file_checksum(str(audio)))
+
+        generate_quiz_from_youtube("https://example.com/video.mp3")
+
+        mock_transcribe.assert_not_called()
+        mock_questions.assert_called_once_with("known text", "Mirror Upload")
+
+    @patch("quizly_app.utils.generate_questions_with_gemini")
+    @patch("quizly_app.utils.transcribe_audio_bytes")
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    @patch("quizly_app.utils.stream_audio_from_youtube")
+    def test_streaming_path_skips_file_download(
+        self, mock_stream, mock_download, mock_transcribe, mock_questions, settings
+    ):
+        settings.AUDIO_STREAMING = True
+        mock_stream.return_value = (b"streamed opus", "Streamed Title", "audio/ogg")
+        mock_transcribe.return_value = "streamed transcript"
+        mock_questions.return_value = self.questions
+
+        generate_quiz_from_youtube(f"https://youtu.be/{VIDEO_ID}")
+
+        mock_download.assert_not_called()
+        mock_transcribe.assert_called_once_with(b"streamed opus", "audio/ogg")
+        assert Transcript.objects.get(video_id=VIDEO_ID).text == "streamed transcript"
+
+    @patch("quizly_app.utils.generate_questions_with_gemini")
+    @patch("quizly_app.utils.transcribe_audio_with_gemini")
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    @patch("quizly_app.utils.stream_audio_from_youtube")
+    def test_streaming_failure_falls_back_to_file_download(
+        self, mock_stream, mock_download, mock_transcribe, mock_questions, settings, tmp_path
+    ):
+        settings.AUDIO_STREAMING = True
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"file audio")
+        mock_stream.side_effect = RuntimeError("broken pipe")
+        mock_download.return_value = (str(audio), "File Title")
+        mock_transcribe.return_value = "file transcript"
+        mock_questions.return_value = self.questions
+
+        generate_quiz_from_youtube(f"https://youtu.be/{VIDEO_ID}")
+
+        mock_transcribe.assert_called_once_with(str(audio))
+        assert Transcript.objects.get(video_id=VIDEO_ID).text == "file transcript"
+
+
+@pytest.mark.django_db
+def test_full_workspace_fails_with_try_again_message(settings, tmp_path):
+    settings.AUDIO_WORKSPACE_ROOT = str(tmp_path)
+    settings.AUDIO_WORKSPACE_QUOTA_BYTES = 10
+    settings.AUDIO_WORKSPACE_QUOTA_WAIT = 0
+    busy = tmp_path / "job-busy"
+    busy.mkdir()
+    (busy / ".owner").write_text(json.dumps({"pid": os.getpid(), "host": socket.gethostname()}))
+    (busy / "audio.webm").write_bytes(b"x" * 100)
+
+    with pytest.raises(ValueError, match="try again later"):
+        generate_quiz_from_youtube(f"https://youtu.be/{VIDEO_ID}")
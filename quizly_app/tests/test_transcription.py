@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch
+from quizly_app import utils
+from quizly_app.utils import merge_overlapping_transcripts, transcribe_audio_with_gemini
+from .fakes import FakeGeminiClient
+
+
+def inline_text(contents):
+    """Echo the inline audio bytes back as the 'transcript'."""
+    return contents[1].inline_data.data.decode("utf-8")
+
+
+class TestMergeOverlappingTranscripts:
+
+    def test_overlap_is_removed(self):
+        first = "welcome to the lecture about the quick brown fox jumps over"
+        second = "brown fox jumps over the lazy dog"
+
+        merged = merge_overlapping_transcripts(first, second)
+
+        assert merged == "welcome to the lecture about the quick brown fox jumps over the lazy dog"
+
+    def test_punctuation_and_case_differences_are_ignored(self):
+        merged = merge_overlapping_transcripts("And then, the Fox jumped.", "the fox jumped over it")
+
+        assert merged == "And then, the Fox jumped. over it"
+
+    def test_without_overlap_texts_are_joined(self):
+        assert merge_overlapping_transcripts("one two three", "four five six") == "one two three four five six"
+
+
+class TestChunkedTranscription:
+
+    @pytest.fixture
+    def long_audio(self, tmp_path, settings, monkeypatch):
+        settings.TRANSCRIPTION_CHUNKING = True
+        settings.TRANSCRIPTION_MAX_WORKERS = 3
+        monkeypatch.setattr(utils, "INLINE_UPLOAD_LIMIT", 60)
+
+        audio = tmp_path / "lecture.mp3"
+        audio.write_bytes(b"x" * 100)
+        return audio
+
+    def test_windows_are_transcribed_and_stitched(self, long_audio, tmp_path):
+        texts = [
+            "part one ends with shared words here",
+            "with shared words here and part two ends near the end",
+            "near the end and finally part three",
+        ]
+        chunk_paths = []
+        for index, text in enumerate(texts):
+            chunk = tmp_path / f"lecture.part{index:03d}.mp3"
+            chunk.write_text(text)
+            chunk_paths.append(str(chunk))
+
+        client = FakeGeminiClient(responder=inline_text)
+
+        with patch("quizly_app.utils.split_audio", return_value=chunk_paths) as mock_split:
+            transcript = transcribe_audio_with_gemini(str(long_audio), client=client)
+
+        mock_split.assert_called_once_with(str(long_audio), 600, 10)
+        assert len(client.calls) == 3
+        assert transcript == (
+            "part one ends with shared words here and part two ends "
+            "near the end and finally part three"
+        )
+        assert not any((tmp_path / f"lecture.part{i:03d}.mp3").exists() for i in range(3))
+
+    def test_small_audio_uses_single_call(self, tmp_path, settings):
+        settings.GEMINI_CLIENT_FACTORY = "quizly_app.tests.fakes.FakeGeminiClient"
+        audio = tmp_path / "short.mp3"
+        audio.write_bytes(b"short")
+
+        with patch("quizly_app.utils.split_audio") as mock_split:
+            transcript = transcribe_audio_with_gemini(str(audio))
+
+        mock_split.assert_not_called()
+        assert transcript == "fake transcript"
@@ -0,0 +1,143 @@
+import sys
+import threading
+import types
+import pytest
+from unittest.mock import patch
+from quizly_app import transcription
+from quizly_app.models import Transcript
+from quizly_app.transcription import (
+    GeminiBackend,
+    TranscriptionBackend,
+    TranscriptionBatcher,
+    WhisperBackend,
+    get_transcription_backend,
+    window_clips,
+)
+from quizly_app.utils import get_transcript_for_url
+
+
+class EchoBackend(TranscriptionBackend):
+    def transcribe(self, audio_path):
+        with open(audio_path, "rb") as audio_file:
+            return f"local: {audio_file.read().decode()}"
+
+
+class TestBackendSelection:
+
+    def test_default_is_gemini(self):
+        assert isinstance(get_transcription_backend(), GeminiBackend)
+
+    def test_backend_is_shared(self):
+        assert get_transcription_backend("whisper") is get_transcription_backend("whisper")
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown transcription backend"):
+            get_transcription_backend("carrier-pigeon")
+
+    @pytest.mark.django_db
+    @patch("quizly_app.utils.download_audio_from_youtube")
+    def test_pipeline_uses_configured_backend(self, mock_download, settings, tmp_path):
+        settings.TRANSCRIPTION_BACKEND = "quizly_app.tests.test_transcription_backends.EchoBackend"
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"hello")
+        mock_download.return_value = (str(audio), "Video Title")
+
+        transcript, title = get_transcript_for_url("https://youtu.be/dQw4w9WgXcQ")
+
+        assert (transcript, title) == ("local: hello", "Video Title")
+        assert Transcript.objects.get(video_id="dQw4w9WgXcQ").text == "local: hello"
+
+
+def test_bytes_default_to_a_temporary_file():
+    assert EchoBackend().transcribe_bytes(b"hello", "audio/ogg") == "local: hello"
+
+
+def test_backend_must_implement_transcribe():
+    with pytest.raises(TypeError):
+        type("Incomplete", (TranscriptionBackend,), {})()
+
+
+class TestTranscriptionBatcher:
+
+    def test_concurrent_requests_share_a_batch(self):
+        release = threading.Event()
+        batches = []
+
+        def run_batch(audios):
+            release.wait(5)
+            batches.append(audios)
+            return [audio.upper() for audio in audios]
+
+        batcher = TranscriptionBatcher(run_batch, max_size=4, max_wait=5)
+        futures = [batcher.submit(name) for name in ["a", "b", "c", "d"]]
+        release.set()
+
+        assert [future.result(5) for future in futures] == ["A", "B", "C", "D"]
+        assert batches == [["a", "b", "c", "d"]]
+
+    def test_failed_batch_is_retried_one_by_one(self):
+        def run_batch(audios):
+            if "broken" in audios:
+                raise ValueError("cannot decode")
+            return [f"text of {audio}" for audio in audios]
+
+        batcher = TranscriptionBatcher(run_batch, max_size=2, max_wait=1)
+        good, bad = batcher.submit("good"), batcher.submit("broken")
+
+        assert good.result(5) == "text of good"
+        with pytest.raises(ValueError, match="cannot decode"):
+            bad.result(5)
+
+
+def test_window_clips_stay_inside_each_input():
+    clips, ends = window_clips([45.0, 10.0])
+
+    assert clips == [
+        {"start": 0.0, "end": 30.0},
+        {"start": 30.0, "end": 45.0},
+        {"start": 45.0, "end": 55.0},
+    ]
+    assert ends == [45.0, 55.0]
+
+
+class TestWhisperBatching:
+
+    @pytest.fixture
+    def fake_whisper(self, monkeypatch):
+        calls = []
+
+        class Pipeline:
+            def transcribe(self, audio, clip_timestamps=None, **options):
+                calls.append({"audio": audio, "clips": clip_timestamps, **options})
+                return [
+                    types.SimpleNamespace(start=0.0, text=" first job "),
+                    types.SimpleNamespace(start=31.0, text="still first"),
+                    types.SimpleNamespace(start=46.0, text="second job"),
+                ], None
+
+        module = types.SimpleNamespace(
+            decode_audio=lambda audio, sampling_rate: [0.0] * int({"a": 45, "b": 10}[audio] * sampling_rate),
+            WhisperModel=lambda *args, **kwargs: None,
+            BatchedInferencePipeline=lambda model: Pipeline(),
+        )
+        monkeypatch.setitem(sys.modules, "faster_whisper", module)
+        monkeypatch.setattr(transcription, "_concatenate", lambda arrays: sum(arrays, []))
+        return calls
+
+    def test_jobs_are_decoded_together_and_split_back(self, fake_whisper, settings):
+        settings.WHISPER_LANGUAGE = "de"
+
+        texts = WhisperBackend().transcribe_batch(["a", "b"])
+
+        assert texts == ["first job still first", "second job"]
+        assert len(fake_whisper) == 1
+        assert len(fake_whisper[0]["clips"]) == 3
+        assert fake_whisper[0]["language"] == "de"
+
+    def test_without_language_jobs_run_separately(self, fake_whisper, settings):
+        settings.WHISPER_LANGUAGE = None
+
+        WhisperBackend().transcribe_batch(["a", "b"])
+
+        assert [call["audio"] for call in fake_whisper] == ["a", "b"]
+        assert all(call["clips"] is None for call in fake_whisper)
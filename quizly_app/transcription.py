@@ -0,0 +1,297 @@
+import abc
+import asyncio
+import io
+import logging
+import math
+import mimetypes
+import os
+import queue
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import utils
+
+
+logger = logging.getLogger(__name__)
+
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30
+
+
+class TranscriptionBackend(abc.ABC):
+    """
+    Turns audio into text. Backends are picked by TRANSCRIPTION_BACKEND and
+    live for the whole process, so they may keep models or clients loaded.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def transcribe(self, audio_path: str) -> str:
+        """
+        Transcribe the audio file at `audio_path`.
+        """
+
+    def transcribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        """
+        Transcribe in-memory audio through a temporary file. Backends that can
+        take bytes directly override this.
+        """
+        suffix = mimetypes.guess_extension(mime_type) or ""
+        with tempfile.NamedTemporaryFile(suffix=suffix) as audio_file:
+            audio_file.write(audio_bytes)
+            audio_file.flush()
+            return self.transcribe(audio_file.name)
+
+    async def atranscribe(self, audio_path: str) -> str:
+        return await sync_to_async(self.transcribe, thread_sensitive=False)(audio_path)
+
+    async def atranscribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        return await sync_to_async(self.transcribe_bytes, thread_sensitive=False)(audio_bytes, mime_type)
+
+
+class GeminiBackend(TranscriptionBackend):
+    """
+    Remote transcription through the Gemini API (chunked, retried and rate limited).
+    """
+
+    name = "gemini"
+
+    def transcribe(self, audio_path: str) -> str:
+        return utils.transcribe_audio_with_gemini(audio_path)
+
+    def transcribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        return utils.transcribe_audio_bytes(audio_bytes, mime_type)
+
+    async def atranscribe(self, audio_path: str) -> str:
+        from . import async_utils
+
+        return await async_utils.atranscribe_audio_with_gemini(audio_path)
+
+    async def atranscribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        from . import async_utils
+
+        return await async_utils.atranscribe_audio_bytes(audio_bytes, mime_type)
+
+
+class TranscriptionBatcher:
+    """
+    Collects requests from concurrently running jobs and hands them to
+    `run_batch` together, on one thread that owns the model. A batch closes
+    after `max_size` requests or `max_wait` seconds. If a batch fails, its
+    requests are retried one by one so only the broken input fails.
+    """
+
+    def __init__(self, run_batch, max_size: int = 4, max_wait: float = 0.5):
+        self.run_batch = run_batch
+        self.max_size = max(max_size, 1)
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.queue = None
+        self.thread = None
+        self.pid = None
+
+    def submit(self, audio) -> Future:
+        future = Future()
+        with self.lock:
+            if self.pid != os.getpid() or not self.thread.is_alive():
+                self.start()
+            self.queue.put((audio, future))
+        return future
+
+    def start(self):
+        # Threads do not survive a fork: the child starts its own.
+        self.pid = os.getpid()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, args=(self.queue,), daemon=True, name="transcription-batcher")
+        self.thread.start()
+
+    def run(self, requests: queue.Queue):
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_size:
+                try:
+                    batch.append(requests.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            self.process([(audio, future) for audio, future in batch if future.set_running_or_notify_cancel()])
+
+    def process(self, batch):
+        if not batch:
+            return
+
+        try:
+            results = self.run_batch([audio for audio, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            logger.warning("Transcription batch of %s failed, retrying one by one: %s", len(batch), exc)
+            for item in batch:
+                self.process([item])
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+def _import_faster_whisper():
+    try:
+        import faster_whisper
+    except ImportError as exc:
+        raise ImportError(
+            "faster-whisper is not installed. Install it to use the whisper transcription backend."
+        ) from exc
+
+    return faster_whisper
+
+
+class WhisperBackend(TranscriptionBackend):
+    """
+    Local CPU transcription with faster-whisper (CTranslate2, int8 by default).
+    The model is loaded once per process. Requests from concurrent jobs are
+    batched: with WHISPER_LANGUAGE set their audio is decoded together in
+    batches of WHISPER_BATCH_SIZE 30s windows.
+    """
+
+    name = "whisper"
+
+    def __init__(self):
+        self.batcher = TranscriptionBatcher(
+            self.transcribe_batch,
+            getattr(settings, "TRANSCRIPTION_BATCH_SIZE", 4),
+            getattr(settings, "TRANSCRIPTION_BATCH_WAIT", 0.5),
+        )
+        self.pipeline = None
+        self.pipeline_pid = None
+
+    def transcribe(self, audio_path: str) -> str:
+        return self.batcher.submit(audio_path).result()
+
+    def transcribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        return self.batcher.submit(io.BytesIO(audio_bytes)).result()
+
+    async def atranscribe(self, audio_path: str) -> str:
+        return await asyncio.wrap_future(self.batcher.submit(audio_path))
+
+    async def atranscribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/mpeg") -> str:
+        return await asyncio.wrap_future(self.batcher.submit(io.BytesIO(audio_bytes)))
+
+    def get_pipeline(self):
+        """
+        Only called from the batcher thread, so no lock is needed.
+        """
+        if self.pipeline is None or self.pipeline_pid != os.getpid():
+            faster_whisper = _import_faster_whisper()
+            model = faster_whisper.WhisperModel(
+                getattr(settings, "WHISPER_MODEL", "small"),
+                device="cpu",
+                compute_type=getattr(settings, "WHISPER_COMPUTE_TYPE", "int8"),
+                cpu_threads=getattr(settings, "WHISPER_CPU_THREADS", 0),
+                download_root=getattr(settings, "WHISPER_MODEL_DIR", None),
+            )
+            self.pipeline = faster_whisper.BatchedInferencePipeline(model)
+            self.pipeline_pid = os.getpid()
+        return self.pipeline
+
+    def decode_options(self) -> dict:
+        return {
+            "language": getattr(settings, "WHISPER_LANGUAGE", None),
+            "beam_size": getattr(settings, "WHISPER_BEAM_SIZE", 1),
+            "batch_size": getattr(settings, "WHISPER_BATCH_SIZE", 8),
+        }
+
+    def transcribe_batch(self, audios: list) -> list[str]:
+        """
+        Without a fixed language every input is transcribed separately,
+        because language detection runs once per call.
+        """
+        if len(audios) == 1 or not getattr(settings, "WHISPER_LANGUAGE", None):
+            return [self.transcribe_one(audio) for audio in audios]
+
+        faster_whisper = _import_faster_whisper()
+        arrays = [faster_whisper.decode_audio(audio, sampling_rate=WHISPER_SAMPLE_RATE) for audio in audios]
+        clips, ends = window_clips([len(array) / WHISPER_SAMPLE_RATE for array in arrays])
+
+        segments, _ = self.get_pipeline().transcribe(
+            _concatenate(arrays),
+            clip_timestamps=clips,
+            **self.decode_options(),
+        )
+
+        texts = [[] for _ in audios]
+        for segment in segments:
+            texts[min(bisect_right(ends, segment.start), len(audios) - 1)].append(segment.text.strip())
+
+        return [join_segments(parts) for parts in texts]
+
+    def transcribe_one(self, audio) -> str:
+        segments, _ = self.get_pipeline().transcribe(audio, **self.decode_options())
+        return join_segments(segment.text.strip() for segment in segments)
+
+
+def _concatenate(arrays):
+    import numpy
+
+    return numpy.concatenate(arrays)
+
+
+def window_clips(durations: list[float], window: float = WHISPER_WINDOW_SECONDS):
+    """
+    Cut audio placed back to back into windows of at most `window` seconds
+    that never cross from one input into the next.
+    Returns (clips, end offset of each input).
+    """
+    clips, ends = [], []
+    offset = 0.0
+    for duration in durations:
+        for index in range(math.ceil(duration / window)):
+            start = index * window
+            clips.append({"start": offset + start, "end": offset + min(start + window, duration)})
+        offset += duration
+        ends.append(offset)
+    return clips, ends
+
+
+def join_segments(parts) -> str:
+    transcript = " ".join(part for part in parts if part)
+    if not transcript:
+        raise ValueError("Whisper produced no transcript.")
+    return transcript
+
+
+TRANSCRIPTION_BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    WhisperBackend.name: WhisperBackend,
+}
+
+_backends: dict[str, TranscriptionBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_transcription_backend(name: str | None = None) -> TranscriptionBackend:
+    """
+    Return the shared backend for `name` (default TRANSCRIPTION_BACKEND):
+    a key of TRANSCRIPTION_BACKENDS or a dotted path to a backend class.
+    """
+    name = name or getattr(settings, "TRANSCRIPTION_BACKEND", "gemini")
+
+    with _backends_lock:
+        if name not in _backends:
+            if name in TRANSCRIPTION_BACKENDS:
+                backend_class = TRANSCRIPTION_BACKENDS[name]
+            elif "." in name:
+                backend_class = import_string(name)
+            else:
+                raise ValueError(f"Unknown transcription backend: {name}")
+            _backends[name] = backend_class()
+        return _backends[name]
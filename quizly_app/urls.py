@@ -1,12 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import QuizViewSet
+from .async_views import quiz_detail, quiz_list
+from .views import QuizViewSet, QuizJobViewSet
 
 router = DefaultRouter()
 router.register(r'quizzes', QuizViewSet, basename='quiz')
+router.register(r'quiz-jobs', QuizJobViewSet, basename='quiz-job')
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/quizzes/", quiz_list, name="async-quiz-list"),
+    path("async/quizzes/<int:pk>/", quiz_detail, name="async-quiz-detail"),
 ]
 
 
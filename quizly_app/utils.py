@@ -1,13 +1,37 @@
+import asyncio
+import difflib
+import hashlib
+import io
 import json
+import logging
 import os
 import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
 from django.conf import settings
+from django.db import IntegrityError
+from django.utils.module_loading import import_string
+from downloader.services import mime_type_for_path, split_audio
+from downloader.workspace import audio_workspace
+from .limits import StageBusy, gemini_call_slot, stage_limit
+from .models import Transcript
+from .retry import InvalidGeminiResponse, call_with_retry
 
 
+logger = logging.getLogger(__name__)
+
 VALID_ANSWERS = {"A", "B", "C", "D"}
 INLINE_UPLOAD_LIMIT = 20 * 1024 * 1024  # 20 MB
+GEMINI_MODEL = "gemini-2.5-flash"
+
+YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+YOUTUBE_PATH_PREFIXES = ("shorts", "embed", "live", "v")
+YOUTUBE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
 
-def download_audio_from_youtube(url: str):
+def download_audio_from_youtube(url: str, output_dir: str | None = None):
     """
     Lazily import downloader service only when needed.
     """
@@ -18,15 +42,170 @@ def download_audio_from_youtube(url: str):
             "yt-dlp is not installed. Install it to use YouTube download features."
         ) from exc
 
-    return download_youtube_audio(url)
+    return download_youtube_audio(url, output_dir)
+
+
+def stream_audio_from_youtube(url: str):
+    """
+    Lazily import the streaming downloader; returns (audio_bytes, title, mime_type).
+    Audio too large to send inline raises, so it takes the file path, which
+    can split it into chunks.
+    """
+    try:
+        from downloader.services import stream_youtube_audio
+    except ImportError as exc:
+        raise ImportError(
+            "yt-dlp is not installed. Install it to use YouTube download features."
+        ) from exc
+
+    return stream_youtube_audio(url, max_bytes=INLINE_UPLOAD_LIMIT)
+
+
+def extract_youtube_video_id(url: str) -> str | None:
+    """
+    Return the canonical 11 character video id for the common YouTube URL
+    forms (watch, youtu.be, shorts, embed, live), ignoring extra query
+    parameters such as `&t=` or `&list=`. Returns None for other URLs.
+    """
+    try:
+        parsed = urlparse(url.strip())
+    except (AttributeError, ValueError):
+        return None
+
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    parts = [part for part in parsed.path.split("/") if part]
+    candidate = None
+
+    if host == "youtu.be":
+        candidate = parts[0] if parts else None
+    elif host in YOUTUBE_HOSTS:
+        if parts[:1] == ["watch"]:
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        elif len(parts) >= 2 and parts[0] in YOUTUBE_PATH_PREFIXES:
+            candidate = parts[1]
+
+    if candidate and YOUTUBE_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+
+def file_checksum(path: str) -> str:
+    """
+    Return the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_cached_transcript(video_id: str | None = None, audio_checksum: str | None = None):
+    """
+    Look up a stored transcript by video id or, failing that, by audio checksum.
+    """
+    if video_id:
+        cached = Transcript.objects.filter(video_id=video_id).first()
+        if cached:
+            return cached
+
+    if audio_checksum:
+        return Transcript.objects.filter(audio_checksum=audio_checksum).first()
+
+    return None
+
+
+def store_transcript(video_id: str | None, title: str, text: str, audio_checksum: str) -> Transcript:
+    """
+    Persist a transcript. Concurrent writers for the same video keep the first row.
+    """
+    if video_id is None:
+        return Transcript.objects.create(title=title, text=text, audio_checksum=audio_checksum)
+
+    try:
+        transcript, _ = Transcript.objects.get_or_create(
+            video_id=video_id,
+            defaults={"title": title, "text": text, "audio_checksum": audio_checksum},
+        )
+    except IntegrityError:
+        transcript = Transcript.objects.get(video_id=video_id)
+
+    return transcript
+
+
+_client_lock = threading.Lock()
+_client_state = {"pid": None, "key": None, "client": None}
+_loop_clients = weakref.WeakKeyDictionary()
+
+
+def gemini_client_key():
+    """
+    Settings a client was built from; a change (e.g. in tests) builds a new one.
+    """
+    return getattr(settings, "GEMINI_CLIENT_FACTORY", None), getattr(settings, "GEMINI_API_KEY", None)
 
 
 def get_gemini_client():
     """
-    Lazily import and return a Gemini client.
+    Return the process-wide Gemini client, created on first use so its
+    keep-alive connection pool is shared by every call in this process.
+    A forked child (e.g. a gunicorn worker) builds its own instead of
+    reusing the parent's sockets. `GEMINI_CLIENT_FACTORY` may point to
+    another callable (e.g. a local fake).
+    """
+    key = gemini_client_key()
+
+    with _client_lock:
+        state = _client_state
+        if state["client"] is None or state["pid"] != os.getpid() or state["key"] != key:
+            state["client"] = build_gemini_client()
+            state["pid"] = os.getpid()
+            state["key"] = key
+        return state["client"]
+
+
+def get_async_gemini_client():
+    """
+    Client whose `.aio` side is used by the async pipeline. Async connection
+    pools belong to one event loop, so there is one client per running loop
+    (under an ASGI server that is one per process).
+    """
+    loop = asyncio.get_running_loop()
+    key = gemini_client_key()
+
+    with _client_lock:
+        cached_key, client = _loop_clients.get(loop, (None, None))
+        if client is None or cached_key != key:
+            client = build_gemini_client()
+            _loop_clients[loop] = (key, client)
+        return client
+
+
+def reset_gemini_client():
+    """
+    Drop the cached clients without closing them; used after fork, where the
+    inherited connections belong to the parent.
+    """
+    global _client_lock
+    _client_lock = threading.Lock()
+    _client_state.update(pid=None, key=None, client=None)
+    _loop_clients.clear()
+
+
+def build_gemini_client():
+    """
+    Lazily import and build a Gemini client.
     This prevents unrelated tests from failing if google-genai is not installed.
     """
+    factory_path = getattr(settings, "GEMINI_CLIENT_FACTORY", None)
+    if factory_path:
+        return import_string(factory_path)()
+
     try:
+        import httpx
         from google import genai
     except ImportError as exc:
         raise ImportError(
@@ -37,7 +216,31 @@ def get_gemini_client():
     if not api_key:
         raise ValueError("GEMINI_API_KEY is not configured in Django settings.")
 
-    return genai.Client(api_key=api_key)
+    pool_size = getattr(settings, "STAGE_CONCURRENCY", {}).get("gemini") or 10
+    limits = httpx.Limits(
+        max_connections=pool_size * 2,
+        max_keepalive_connections=pool_size * 2,
+        keepalive_expiry=getattr(settings, "GEMINI_KEEPALIVE_EXPIRY", 120),
+    )
+    return genai.Client(
+        api_key=api_key,
+        http_options={"client_args": {"limits": limits}, "async_client_args": {"limits": limits}},
+    )
+
+
+def warm_up_gemini_client():
+    """
+    Build the client and open a connection with a cheap metadata request,
+    so the first real call does not pay for TLS setup. Failures are only logged.
+    """
+    try:
+        get_gemini_client().models.get(model=GEMINI_MODEL)
+    except Exception as exc:
+        logger.warning("Gemini warm-up failed: %s", exc)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_gemini_client)
 
 
 def get_genai_types():
@@ -123,18 +326,7 @@ def build_transcription_prompt() -> str:
     )
 
 
-def build_question_prompt(transcript: str, video_title: str) -> str:
-    return f"""
-Create exactly 10 multiple-choice questions in English about the following video.
-
-Title:
-{video_title}
-
-Transcript:
----
-{transcript}
----
-
+QUESTION_RULES = """
 IMPORTANT:
 - Return only valid JSON.
 - No Markdown.
@@ -151,88 +343,277 @@ Example:
 
 Format:
 [
-  {{
+  {
     "question": "Question text",
     "options": ["Option A", "Option B", "Option C", "Option D"],
     "answer": "A"
-  }}
+  }
 ]
 """.strip()
 
 
-def transcribe_audio_with_gemini(audio_path: str) -> str:
+def build_question_prompt(transcript: str, video_title: str) -> str:
+    return f"""
+Create exactly 10 multiple-choice questions in English about the following video.
+
+Title:
+{video_title}
+
+Transcript:
+---
+{transcript}
+---
+
+{QUESTION_RULES}
+""".strip()
+
+
+def build_audio_question_prompt(video_title: str) -> str:
+    return f"""
+Listen to the attached audio of the following video and create exactly 10
+multiple-choice questions in English about its content.
+
+Title:
+{video_title}
+
+{QUESTION_RULES}
+""".strip()
+
+
+def transcribe_audio_with_gemini(audio_path: str, client=None) -> str:
     """
     Transcribe audio using Gemini.
-    Uses inline bytes for smaller files and Files API for larger ones.
+    Large files are split into overlapping windows that are transcribed in
+    parallel when `TRANSCRIPTION_CHUNKING` is enabled; otherwise they go
+    through the Files API in one call.
     """
-    client = get_gemini_client()
-    types = get_genai_types()
-    prompt = build_transcription_prompt()
+    client = client or get_gemini_client()
 
+    chunking = getattr(settings, "TRANSCRIPTION_CHUNKING", False)
+    if chunking and os.path.getsize(audio_path) > INLINE_UPLOAD_LIMIT:
+        return transcribe_audio_chunked(audio_path, client=client)
+
+    return transcribe_audio_part(audio_path, client)
+
+
+def transcribe_audio_part(audio_path: str, client) -> str:
+    """
+    Transcribe a single audio file in one Gemini call.
+    Uses inline bytes for smaller files and Files API for larger ones.
+    """
     file_size = os.path.getsize(audio_path)
 
     if file_size > INLINE_UPLOAD_LIMIT:
-        uploaded_file = client.files.upload(file=audio_path)
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt, uploaded_file],
-        )
-    else:
-        with open(audio_path, "rb") as audio_file:
-            audio_bytes = audio_file.read()
+        with gemini_call_slot():
+            uploaded_file = client.files.upload(
+                file=audio_path,
+                config={"mime_type": mime_type_for_path(audio_path)},
+            )
+        return request_transcript(client, uploaded_file)
 
-        audio_part = types.Part.from_bytes(
-            data=audio_bytes,
-            mime_type="audio/mpeg",
-        )
+    with open(audio_path, "rb") as audio_file:
+        audio_bytes = audio_file.read()
+
+    return transcribe_audio_bytes(audio_bytes, mime_type_for_path(audio_path), client=client)
 
+
+def transcribe_audio_bytes(audio_bytes: bytes, mime_type: str = "audio/mpeg", client=None) -> str:
+    """
+    Transcribe audio held in memory, e.g. from the streaming download path.
+    """
+    client = client or get_gemini_client()
+
+    if len(audio_bytes) > INLINE_UPLOAD_LIMIT:
+        with gemini_call_slot():
+            uploaded_file = client.files.upload(
+                file=io.BytesIO(audio_bytes),
+                config={"mime_type": mime_type},
+            )
+        return request_transcript(client, uploaded_file)
+
+    types = get_genai_types()
+    audio_part = types.Part.from_bytes(
+        data=audio_bytes,
+        mime_type=mime_type,
+    )
+    return request_transcript(client, audio_part)
+
+
+def request_transcript(client, audio) -> str:
+    """
+    Ask Gemini for a transcript, retrying transient failures (see RetryPolicy).
+    """
+    def attempt():
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt, audio_part],
+            model=GEMINI_MODEL,
+            contents=[build_transcription_prompt(), audio],
         )
+        return transcript_from_response(response)
+
+    return call_with_retry(attempt, "transcription")
+
 
+def transcript_from_response(response) -> str:
     transcript = getattr(response, "text", None)
     if not transcript:
-        raise ValueError("Gemini produced no transcript.")
+        raise InvalidGeminiResponse("Gemini produced no transcript.")
 
     return transcript.strip()
 
 
-def generate_questions_with_gemini(transcript: str, video_title: str) -> dict:
+def transcribe_audio_chunked(audio_path: str, client=None) -> str:
+    """
+    Split audio into overlapping windows, transcribe them on a bounded thread
+    pool and stitch the parts back together.
+    """
+    client = client or get_gemini_client()
+    window = getattr(settings, "TRANSCRIPTION_CHUNK_SECONDS", 600)
+    overlap = getattr(settings, "TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", 10)
+    max_workers = getattr(settings, "TRANSCRIPTION_MAX_WORKERS", 4)
+
+    chunk_paths = split_audio(audio_path, window, overlap)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(executor.map(lambda path: transcribe_audio_part(path, client), chunk_paths))
+    finally:
+        for chunk_path in chunk_paths:
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+
+    transcript = parts[0]
+    for part in parts[1:]:
+        transcript = merge_overlapping_transcripts(transcript, part)
+
+    return transcript
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlapping_transcripts(first: str, second: str, window_words: int = 80, min_match: int = 3) -> str:
+    """
+    Join two transcripts whose audio overlapped, dropping the repeated words.
+    The longest common word run between the tail of `first` and the head of
+    `second` is used as the seam; without one the texts are just concatenated.
+    """
+    first_words = first.split()
+    second_words = second.split()
+
+    if not first_words:
+        return second
+    if not second_words:
+        return first
+
+    tail_start = max(0, len(first_words) - window_words)
+    tail = [_normalize_word(word) for word in first_words[tail_start:]]
+    head = [_normalize_word(word) for word in second_words[:window_words]]
+
+    match = difflib.SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(
+        0, len(tail), 0, len(head)
+    )
+
+    if match.size < min_match:
+        return f"{first} {second}"
+
+    kept_first = first_words[:tail_start + match.a + match.size]
+    kept_second = second_words[match.b + match.size:]
+    return " ".join(kept_first + kept_second)
+
+
+def generate_questions_with_gemini(transcript: str, video_title: str, client=None) -> dict:
     """
     Generate quiz questions from a transcript using Gemini.
+    Unusable answers are retried like transient errors; only the question
+    request is repeated, the transcript in hand is reused.
+    """
+    client = client or get_gemini_client()
+
+    def attempt():
+        response = client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=build_question_prompt(transcript, video_title),
+            config=build_question_config(),
+        )
+        return questions_from_response(response, video_title)
+
+    return call_with_retry(attempt, "questions")
+
+
+def build_question_config(response_schema=None):
+    types = get_genai_types()
+    return types.GenerateContentConfig(
+        temperature=0.2,
+        response_mime_type="application/json",
+        response_schema=response_schema,
+    )
+
+
+def build_question_schema():
+    """
+    JSON schema for the question list, so Gemini's answer has the expected shape.
     """
-    client = get_gemini_client()
     types = get_genai_types()
-    prompt = build_question_prompt(transcript, video_title)
-
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            temperature=0.2,
-            response_mime_type="application/json",
-        ),
+    string = types.Schema(type="STRING")
+    question = types.Schema(
+        type="OBJECT",
+        properties={
+            "question": string,
+            "options": types.Schema(type="ARRAY", items=string, min_items=4, max_items=4),
+            "answer": types.Schema(type="STRING", enum=sorted(VALID_ANSWERS)),
+        },
+        required=["question", "options", "answer"],
+        property_ordering=["question", "options", "answer"],
     )
+    return types.Schema(type="ARRAY", items=question, min_items=10, max_items=10)
+
+
+def generate_quiz_from_audio(audio_bytes: bytes, mime_type: str, video_title: str, client=None) -> dict:
+    """
+    One-shot mode: send the audio with the question instructions in a single
+    call, skipping the transcript round trip. Nothing is stored for reuse.
+    """
+    client = client or get_gemini_client()
+    types = get_genai_types()
+    audio_part = types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
+
+    def attempt():
+        response = client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[build_audio_question_prompt(video_title), audio_part],
+            config=build_question_config(build_question_schema()),
+        )
+        return questions_from_response(response, video_title)
+
+    return call_with_retry(attempt, "one_shot_quiz")
+
 
+def questions_from_response(response, video_title: str) -> dict:
+    """
+    Parse and validate Gemini's JSON answer into the quiz data structure.
+    """
     response_text = getattr(response, "text", None)
     if not response_text:
-        raise ValueError("Gemini returned no usable text.")
+        raise InvalidGeminiResponse("Gemini returned no usable text.")
 
     cleaned = clean_gemini_json(response_text)
 
     try:
         questions_raw = json.loads(cleaned)
     except json.JSONDecodeError as exc:
-        raise ValueError("Gemini returned invalid JSON.") from exc
+        raise InvalidGeminiResponse("Gemini returned invalid JSON.") from exc
 
     if not isinstance(questions_raw, list):
-        raise ValueError("Gemini did not return a list of questions.")
+        raise InvalidGeminiResponse("Gemini did not return a list of questions.")
 
-    formatted_questions = [validate_question_item(item) for item in questions_raw]
+    try:
+        formatted_questions = [validate_question_item(item) for item in questions_raw]
+    except (AttributeError, ValueError) as exc:
+        raise InvalidGeminiResponse(str(exc)) from exc
 
     if len(formatted_questions) != 10:
-        raise ValueError("Gemini must return exactly 10 questions.")
+        raise InvalidGeminiResponse("Gemini must return exactly 10 questions.")
 
     return {
         "title": video_title,
@@ -241,23 +622,146 @@ def generate_questions_with_gemini(transcript: str, video_title: str) -> dict:
     }
 
 
-def generate_quiz_from_youtube(url: str) -> dict:
+def get_transcript_for_url(url: str) -> tuple[str, str]:
     """
-    Full quiz generation workflow:
-    1. Download audio from YouTube
-    2. Transcribe audio with Gemini
-    3. Generate quiz questions from transcript
+    Return (transcript, video_title) for a video, using the transcript cache
+    before falling back to download + transcription with the configured backend.
     """
-    try:
-        audio_path, video_title = download_audio_from_youtube(url)
-    except Exception as exc:
-        raise ValueError(f"Could not download audio: {exc}") from exc
+    from .transcription import get_transcription_backend
+
+    video_id = extract_youtube_video_id(url)
+    cached = get_cached_transcript(video_id=video_id)
+    if cached:
+        return cached.text, cached.title
+
+    with youtube_audio(url) as audio:
+        return transcribe_downloaded_audio(video_id, audio, get_transcription_backend())
+
+
+@contextmanager
+def youtube_audio(url: str):
+    """
+    Download the audio of a video and yield a dict with its title, checksum
+    and mime type plus either `bytes` or a `path` (removed on exit).
+    With `AUDIO_STREAMING` the audio is piped through ffmpeg in memory; the
+    file-based download is kept as a fallback.
+    """
+    if getattr(settings, "AUDIO_STREAMING", False):
+        streamed = None
+        with stage_limit("download"):
+            try:
+                streamed = stream_audio_from_youtube(url)
+            except Exception as exc:
+                logger.warning("Streaming download failed, using file download: %s", exc)
+
+        if streamed is not None:
+            audio_bytes, video_title, mime_type = streamed
+            yield {
+                "title": video_title,
+                "checksum": hashlib.sha256(audio_bytes).hexdigest(),
+                "mime_type": mime_type,
+                "bytes": audio_bytes,
+                "path": None,
+            }
+            return
+
+    with audio_workspace() as workspace:
+        try:
+            with stage_limit("download"):
+                audio_path, video_title = download_audio_from_youtube(url, workspace)
+            audio_checksum = file_checksum(audio_path)
+        except StageBusy:
+            raise
+        except Exception as exc:
+            raise ValueError(f"Could not download audio: {exc}") from exc
+
+        yield {
+            "title": video_title,
+            "checksum": audio_checksum,
+            "mime_type": mime_type_for_path(audio_path),
+            "bytes": None,
+            "path": audio_path,
+        }
+
+
+def transcribe_downloaded_audio(video_id, audio: dict, backend) -> tuple[str, str]:
+    def transcribe():
+        if audio["bytes"] is not None:
+            return backend.transcribe_bytes(audio["bytes"], audio["mime_type"])
+        return backend.transcribe(audio["path"])
+
+    return transcribe_with_cache(video_id, audio["title"], audio["checksum"], transcribe)
+
+
+def one_shot_audio_bytes(audio: dict) -> bytes | None:
+    """
+    The audio as bytes if it is short enough for one-shot mode
+    (QUIZ_ONE_SHOT_MAX_BYTES, at most the inline upload limit), else None.
+    """
+    limit = min(getattr(settings, "QUIZ_ONE_SHOT_MAX_BYTES", 0), INLINE_UPLOAD_LIMIT)
+
+    if audio["bytes"] is not None:
+        return audio["bytes"] if len(audio["bytes"]) <= limit else None
+
+    if os.path.getsize(audio["path"]) > limit:
+        return None
+    with open(audio["path"], "rb") as audio_file:
+        return audio_file.read()
+
+
+def one_shot_enabled() -> bool:
+    """
+    One-shot mode needs Gemini to hear the audio, so it only applies with the Gemini backend.
+    """
+    from .transcription import GeminiBackend, get_transcription_backend
+
+    return getattr(settings, "QUIZ_ONE_SHOT", False) and isinstance(get_transcription_backend(), GeminiBackend)
+
+
+def transcribe_with_cache(video_id, video_title: str, audio_checksum: str, transcribe) -> tuple[str, str]:
+    """
+    Run `transcribe` unless a transcript with the same audio checksum exists,
+    and store the new transcript for later requests.
+    """
+    cached = get_cached_transcript(audio_checksum=audio_checksum)
+    if cached:
+        return cached.text, video_title
 
     try:
-        transcript = transcribe_audio_with_gemini(audio_path)
+        transcript = transcribe()
     except Exception as exc:
         raise ValueError(f"Could not transcribe audio: {exc}") from exc
 
+    store_transcript(video_id, video_title, transcript, audio_checksum)
+    return transcript, video_title
+
+
+def generate_quiz_from_youtube(url: str) -> dict:
+    """
+    Full quiz generation workflow:
+    1. Reuse a cached transcript for the video, if there is one
+    2. Otherwise download audio from YouTube and transcribe it (TRANSCRIPTION_BACKEND)
+    3. Generate quiz questions from transcript
+    With `QUIZ_ONE_SHOT`, short uncached videos skip 2 and 3: the audio goes
+    to Gemini with the question instructions in one call.
+    """
+    from .transcription import get_transcription_backend
+
+    video_id = extract_youtube_video_id(url)
+
+    if one_shot_enabled() and not get_cached_transcript(video_id=video_id):
+        with youtube_audio(url) as audio:
+            audio_bytes = one_shot_audio_bytes(audio)
+            if audio_bytes is not None:
+                try:
+                    return generate_quiz_from_audio(audio_bytes, audio["mime_type"], audio["title"])
+                except Exception as exc:
+                    raise ValueError(f"Could not generate quiz questions: {exc}") from exc
+
+            transcript, video_title = transcribe_downloaded_audio(video_id, audio, get_transcription_backend())
+    else:
+        transcript, video_title = get_transcript_for_url(url)
+
     try:
         return generate_questions_with_gemini(transcript, video_title)
     except Exception as exc:
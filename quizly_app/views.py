@@ -1,48 +1,142 @@
+from django.db.models import Count, Prefetch
+from django.http import Http404
+from django.urls import reverse
 from rest_framework import viewsets, status
+from rest_framework.exceptions import Throttled
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from .models import Quiz, Question
-from .serializers import QuizSerializer, CreateQuizSerializer
-from .utils import generate_quiz_from_youtube
+from core.db_routers import replica_reads
+from .cache import (
+    PrerenderedJSONResponse,
+    cache_quiz_detail,
+    etag_matches,
+    get_cached_quiz_detail,
+)
+from .models import Quiz, Question, QuizJob
+from .pagination import QuizCursorPagination
+from .serializers import (
+    QuizSerializer,
+    QuizSummarySerializer,
+    CreateQuizSerializer,
+    QuizJobSerializer,
+    quiz_detail_data,
+)
+from .jobs import QueueFull, enqueue_quiz_job
 
 
 class QuizViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = QuizSerializer
+    pagination_class = QuizCursorPagination
 
     def get_queryset(self):
-        return Quiz.objects.filter(user=self.request.user)
+        queryset = Quiz.objects.filter(user=self.request.user).order_by(*QuizCursorPagination.ordering)
 
-    def create(self, request, *args, **kwargs):
-        print("REQUEST.DATA:", request.data)
+        if self.uses_summary():
+            return queryset.annotate(question_count=Count("questions"))
+
+        return queryset.prefetch_related(
+            Prefetch("questions", queryset=Question.objects.order_by("id"))
+        )
+
+    def get_serializer_class(self):
+        if self.uses_summary():
+            return QuizSummarySerializer
+        return QuizSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+
+        fields = self.request.query_params.get("fields") if self.request else None
+        if fields:
+            context["fields"] = [field.strip() for field in fields.split(",") if field.strip()]
+
+        return context
+
+    @replica_reads()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Serve the detail view from the rendered-JSON cache, filled by the
+        `.values()` fast path. Supports ETag / If-None-Match. Sparse
+        fieldsets and non-JSON renderers go through the regular serializer.
+        Unlike the list it always reads the primary: a lagging replica row
+        would be cached until the next write.
+        """
+        if "fields" in request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+
+        try:
+            quiz_id = int(kwargs["pk"])
+        except (TypeError, ValueError):
+            raise Http404
+
+        entry = get_cached_quiz_detail(quiz_id)
+        if entry is None:
+            data = quiz_detail_data(quiz_id, request.user)
+            if data is None:
+                raise Http404
+            if request.accepted_renderer.format != "json":
+                return Response(data)
+            entry = cache_quiz_detail(quiz_id, request.user.pk, JSONRenderer().render(data))
+
+        if entry["user_id"] != request.user.pk:
+            raise Http404
 
+        if request.accepted_renderer.format != "json":
+            return Response(quiz_detail_data(quiz_id, request.user))
 
+        if etag_matches(request.headers.get("If-None-Match"), entry["etag"]):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = PrerenderedJSONResponse(entry["body"])
+
+        response["ETag"] = entry["etag"]
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def uses_summary(self) -> bool:
+        """
+        The list returns summaries unless `?expand=questions` asks for the full quizzes.
+        """
+        if self.action != "list":
+            return False
+
+        expand = self.request.query_params.get("expand", "")
+        return "questions" not in [value.strip() for value in expand.split(",")]
+
+    def create(self, request, *args, **kwargs):
+        """
+        Queue a generation job and return at once. Clients poll the job
+        status endpoint until the quiz is ready.
+        """
         serializer = CreateQuizSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         video_url = serializer.validated_data["url"]
-
         try:
-            data = generate_quiz_from_youtube(video_url)
-        except ValueError as e:
-            print("CREATE QUIZ ERROR:", repr(e))
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        quiz = Quiz.objects.create(
-            user=request.user,
-            title=data["title"],
-            description=data["description"],
-            video_url=video_url
+            job = enqueue_quiz_job(request.user, video_url)
+        except QueueFull as exc:
+            raise Throttled(wait=exc.retry_after, detail=str(exc))
+
+        return Response(
+            QuizJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("quiz-job-detail", args=[job.id])},
         )
 
-        for q in data["questions"]:
-            Question.objects.create(
-                quiz=quiz,
-                question_title=q["question_title"],
-                question_options=q["question_options"],
-                answer=q["answer"]
-            )
-
-        return Response(QuizSerializer(quiz).data, status=status.HTTP_201_CREATED)
-    
-   
\ No newline at end of file
+
+class QuizJobViewSet(viewsets.ReadOnlyModelViewSet):
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizJobSerializer
+
+    def get_queryset(self):
+        return (
+            QuizJob.objects.filter(user=self.request.user)
+            .select_related("quiz")
+            .prefetch_related(Prefetch("quiz__questions", queryset=Question.objects.order_by("id")))
+            .order_by("-created_at")
+        )
@@ -1,23 +1,86 @@
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from .cache import token_user_cache
 
 User = get_user_model()
 
+USER_CLAIMS = ("username", "email", "is_active")
+
+
+def user_from_claims(payload):
+    """
+    Build a user from token claims without querying the database.
+    Only the id and USER_CLAIMS are loaded; every other field is deferred
+    and fetched on first access. Returns None for tokens without the claims.
+    """
+    if any(claim not in payload for claim in USER_CLAIMS):
+        return None
+
+    claims = {claim: payload[claim] for claim in USER_CLAIMS}
+    claims[User._meta.pk.attname] = User._meta.pk.to_python(payload["user_id"])
+
+    # from_db expects values in concrete field order.
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    return User.from_db(User.objects.db, fields, [claims[name] for name in fields])
+
+
 class CookieJWTAuthentication(BaseAuthentication):
     """
     Custom authentication class that authenticates users. Using a JWT stored in an HTTP cookie.
+    Verified tokens are remembered in `token_user_cache`, so repeat requests skip the user lookup.
+    With AUTH_STATELESS_TOKENS the user is built from the token claims instead of the database.
     """
     def authenticate(self, request):
         token = request.COOKIES.get("access_token")
         if not token:
             return None
+
+        user = token_user_cache.get(token)
+        if user is not None:
+            return (user, None)
+
         try:
             access = AccessToken(token)
-            user = User.objects.get(id=access["user_id"])
+            user = self.get_user(access.payload)
+        except Exception:
+            raise AuthenticationFailed("Invalid or expired token")
+
+        return self.accept(token, access, user)
+
+    async def aauthenticate(self, request):
+        """
+        Async variant for plain Django async views; same result as `authenticate`.
+        """
+        token = request.COOKIES.get("access_token")
+        if not token:
+            return None
+
+        user = token_user_cache.get(token)
+        if user is not None:
             return (user, None)
+
+        try:
+            access = AccessToken(token)
+            user = self.get_claims_user(access.payload) or await User.objects.aget(id=access["user_id"])
         except Exception:
             raise AuthenticationFailed("Invalid or expired token")
 
+        return self.accept(token, access, user)
+
+    def accept(self, token, access, user):
+        if not user.is_active:
+            raise AuthenticationFailed("Invalid or expired token")
+
+        token_user_cache.set(token, access.payload, user)
+        return (user, None)
+
+    def get_user(self, payload):
+        return self.get_claims_user(payload) or User.objects.get(id=payload["user_id"])
 
+    def get_claims_user(self, payload):
+        if getattr(settings, "AUTH_STATELESS_TOKENS", False):
+            return user_from_claims(payload)
+        return None
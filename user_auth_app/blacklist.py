@@ -0,0 +1,142 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+# Rows committed slightly out of id order by concurrent writers are picked up
+# by re-reading this many ids below the last one seen.
+SYNC_OVERLAP = 100
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings. `in` never gives false negatives;
+    false positives happen at roughly `error_rate` once `capacity` items are added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode("utf-8")).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """
+    Per-process bloom filter of blacklisted refresh token jtis, kept in sync
+    with the BlacklistedToken table every `sync_interval` seconds.
+    A negative answer means the token is not blacklisted (as of the last sync)
+    and the database check can be skipped; a positive one must be confirmed.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, sync_interval: float = 5):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sync_interval > 0
+
+    def reset(self):
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._last_id = 0
+            self._last_sync = None
+
+    def add(self, jti: str):
+        with self._lock:
+            self._bloom.add(jti)
+
+    def sync(self):
+        """
+        Add blacklist rows written since the last sync (by any process).
+        The filter is rebuilt from scratch when it outgrows its capacity.
+        """
+        with self._lock:
+            if self._bloom.count >= self._bloom.capacity:
+                self._bloom = BloomFilter(self._bloom.capacity * 2, self.error_rate)
+                self._last_id = 0
+
+            rows = (
+                BlacklistedToken.objects.filter(
+                    id__gt=max(self._last_id - SYNC_OVERLAP, 0),
+                    token__expires_at__gt=timezone.now(),
+                )
+                .order_by("id")
+                .values_list("id", "token__jti")
+            )
+            for row_id, jti in rows.iterator():
+                if jti not in self._bloom:
+                    self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+
+            self._last_sync = time.monotonic()
+
+    def might_contain(self, jti: str) -> bool:
+        if not self.enabled:
+            return True
+
+        if self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+        with self._lock:
+            return jti in self._bloom
+
+
+def prune_expired_tokens(batch_size: int = 1000, pause: float = 0) -> tuple[int, int]:
+    """
+    Delete expired outstanding tokens (and their blacklist rows) in batches,
+    so the tables are never locked for long. Returns (outstanding, blacklisted) removed.
+    """
+    cutoff = timezone.now()
+    outstanding = blacklisted = 0
+
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        _, deleted = OutstandingToken.objects.filter(id__in=ids).delete()
+        outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+
+        if pause:
+            time.sleep(pause)
+
+    return outstanding, blacklisted
+
+
+blacklist_filter = BlacklistFilter(
+    capacity=getattr(settings, "BLACKLIST_FILTER_CAPACITY", 100_000),
+    error_rate=getattr(settings, "BLACKLIST_FILTER_ERROR_RATE", 0.001),
+    sync_interval=getattr(settings, "BLACKLIST_FILTER_SYNC_INTERVAL", 5),
+)
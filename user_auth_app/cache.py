@@ -0,0 +1,109 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+
+
+class TokenUserCache:
+    """
+    Bounded, thread-safe LRU cache of verified access tokens -> user objects,
+    keyed by the token's jti. An entry lives for at most `ttl` seconds and
+    never beyond the token's own expiry. A digest of the full token is kept
+    so a different token reusing a jti can never hit.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_jti(token: str) -> str | None:
+        """
+        Read the jti claim without verifying the signature (lookup only).
+        """
+        try:
+            return jwt.decode(token, options={"verify_signature": False}).get("jti")
+        except jwt.PyJWTError:
+            return None
+
+    def get(self, token: str):
+        jti = self.get_jti(token)
+
+        with self._lock:
+            entry = self._entries.get(jti) if jti else None
+
+            if entry is None or entry["digest"] != self._digest(token) or entry["expires_at"] <= time.time():
+                if entry is not None:
+                    del self._entries[jti]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(jti)
+            self.hits += 1
+            user = entry["user"]
+
+        # Requests may mutate request.user; never hand out the shared instance.
+        return copy.copy(user)
+
+    def set(self, token: str, payload: dict, user):
+        jti = payload.get("jti")
+        if not jti or not self.max_size:
+            return
+
+        expires_at = min(time.time() + self.ttl, payload.get("exp", 0))
+
+        with self._lock:
+            self._entries[jti] = {
+                "digest": self._digest(token),
+                "user": user,
+                "user_id": user.pk,
+                "expires_at": expires_at,
+            }
+            self._entries.move_to_end(jti)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str):
+        jti = self.get_jti(token)
+        with self._lock:
+            self._entries.pop(jti, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for jti in [jti for jti, entry in self._entries.items() if entry["user_id"] == user_id]:
+                del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+token_user_cache = TokenUserCache(
+    max_size=getattr(settings, "AUTH_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+)
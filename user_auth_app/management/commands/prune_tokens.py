@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from user_auth_app.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of tokens deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = prune_expired_tokens(options["batch_size"], options["pause"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {outstanding} outstanding and {blacklisted} blacklisted token(s)."
+        ))
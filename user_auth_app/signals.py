@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .blacklist import blacklist_filter
+from .cache import token_user_cache
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drops cached authentications of a user that was changed (e.g. deactivated) or deleted.
+    """
+    token_user_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def invalidate_cached_user_on_blacklist(sender, instance, created, **kwargs):
+    """
+    Drops cached authentications of a user whose token was blacklisted
+    and records the jti in this process's blacklist filter right away.
+    """
+    blacklist_filter.add(instance.token.jti)
+    if instance.token.user_id is not None:
+        token_user_cache.invalidate_user(instance.token.user_id)
@@ -0,0 +1,170 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from user_auth_app.cache import TokenUserCache, token_user_cache
+from user_auth_app.utils import create_tokens_for_user
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestCookieJWTAuthenticationCache:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(
+            username="anja399",
+            email="anja@example.com",
+            password="Str0ngPass!123"
+        )
+
+    @pytest.fixture
+    def token_client(self, client, user):
+        refresh, access = create_tokens_for_user(user)
+        client.cookies["access_token"] = access
+        client.cookies["refresh_token"] = refresh
+        return client
+
+    def test_repeat_requests_skip_user_lookup(self, token_client):
+        url = reverse("quiz-list")
+        token_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = token_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any("user_auth_app_customuser" in q["sql"] for q in queries.captured_queries)
+        assert token_user_cache.stats()["hits"] == 1
+        assert token_user_cache.stats()["misses"] == 1
+
+    def test_deactivation_invalidates_cache(self, token_client, user):
+        token_client.get(reverse("quiz-list"))
+        assert token_user_cache.stats()["size"] == 1
+
+        user.is_active = False
+        user.save()
+
+        assert token_user_cache.stats()["size"] == 0
+
+    def test_logout_invalidates_cache(self, token_client):
+        token_client.get(reverse("quiz-list"))
+
+        token_client.post(reverse("logout"))
+
+        assert token_user_cache.stats()["size"] == 0
+
+    def test_forged_token_with_cached_jti_is_rejected(self, token_client):
+        token_client.get(reverse("quiz-list"))
+        access = token_client.cookies["access_token"].value
+        header, payload, signature = access.split(".")
+        token_client.cookies["access_token"] = f"{header}.{payload}.{signature[:-4]}AAAA"
+
+        response = token_client.get(reverse("quiz-list"))
+
+        assert response.status_code in [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN]
+
+
+@pytest.mark.django_db
+class TestTokenUserCache:
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(username="u", email="u@example.com", password="Str0ngPass!123")
+
+    def make_entry(self, cache, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+        access = AccessToken.for_user(user)
+        token = str(access)
+        cache.set(token, access.payload, user)
+        return token
+
+    def test_least_recently_used_entry_is_evicted(self, user):
+        cache = TokenUserCache(max_size=2, ttl=60)
+        first = self.make_entry(cache, user)
+        second = self.make_entry(cache, user)
+        cache.get(first)
+        self.make_entry(cache, user)
+
+        assert cache.get(first) is not None
+        assert cache.get(second) is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self, user):
+        cache = TokenUserCache(max_size=10, ttl=0)
+        token = self.make_entry(cache, user)
+
+        assert cache.get(token) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_cached_user_is_a_copy(self, user):
+        cache = TokenUserCache(max_size=10, ttl=60)
+        token = self.make_entry(cache, user)
+
+        cached = cache.get(token)
+        cached.first_name = "changed"
+
+        assert cache.get(token).first_name == ""
+
+
+@pytest.mark.django_db
+class TestStatelessTokens:
+
+    @pytest.fixture(autouse=True)
+    def stateless(self, settings):
+        settings.AUTH_STATELESS_TOKENS = True
+
+    @pytest.fixture
+    def user(self):
+        return User.objects.create_user(
+            username="anja399",
+            email="anja@example.com",
+            password="Str0ngPass!123",
+            first_name="Anja",
+        )
+
+    def authenticate(self, token):
+        from rest_framework.test import APIRequestFactory
+        from user_auth_app.authentication import CookieJWTAuthentication
+        request = APIRequestFactory().get("/")
+        request.COOKIES["access_token"] = token
+        return CookieJWTAuthentication().authenticate(request)[0]
+
+    def test_user_is_built_from_claims_without_queries(self, user):
+        _, access = create_tokens_for_user(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            request_user = self.authenticate(access)
+            assert (request_user.pk, request_user.username, request_user.email) == (user.pk, "anja399", "anja@example.com")
+            assert request_user.is_authenticated
+
+        assert len(queries.captured_queries) == 0
+
+    def test_other_fields_are_loaded_on_access(self, user):
+        _, access = create_tokens_for_user(user)
+        request_user = self.authenticate(access)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert request_user.first_name == "Anja"
+
+        assert len(queries.captured_queries) == 1
+
+    def test_tokens_without_claims_fall_back_to_database(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+        access = str(AccessToken.for_user(user))
+
+        with CaptureQueriesContext(connection) as queries:
+            request_user = self.authenticate(access)
+
+        assert request_user.first_name == "Anja"
+        assert len(queries.captured_queries) == 1
+
+    def test_inactive_claim_is_rejected(self, user):
+        from rest_framework.exceptions import AuthenticationFailed
+        user.is_active = False
+        _, access = create_tokens_for_user(user)
+
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(access)
@@ -0,0 +1,80 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from django.contrib.auth import get_user_model
+from user_auth_app.blacklist import BloomFilter, blacklist_filter
+from user_auth_app.tokens import RefreshToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="anja399", email="anja@example.com", password="Str0ngPass!123")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+class TestBlacklistFilter:
+
+    def test_unknown_token_skips_blacklist_query(self, user):
+        token = str(RefreshToken.for_user(user))
+        blacklist_filter.sync()
+
+        with CaptureQueriesContext(connection) as queries:
+            RefreshToken(token)
+
+        assert not any("blacklistedtoken" in q["sql"] for q in queries.captured_queries)
+
+    def test_blacklisted_token_is_rejected(self, user):
+        refresh = RefreshToken.for_user(user)
+        refresh.blacklist()
+
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_blacklistings_from_other_processes_are_synced(self, user, settings):
+        refresh = RefreshToken.for_user(user)
+        blacklist_filter.sync()
+        # bulk_create skips the post_save signal, like a write from another process.
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=refresh["jti"]))])
+
+        assert not blacklist_filter.might_contain(refresh["jti"])
+
+        blacklist_filter.sync()
+
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_disabled_filter_always_checks_database(self, user, monkeypatch):
+        monkeypatch.setattr(blacklist_filter, "sync_interval", 0)
+
+        assert blacklist_filter.might_contain("anything")
+
+
+@pytest.mark.django_db
+def test_prune_tokens_removes_only_expired_tokens(user):
+    for i in range(5):
+        RefreshToken.for_user(user).blacklist()
+    live = RefreshToken.for_user(user)
+    OutstandingToken.objects.exclude(jti=live["jti"]).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+    call_command("prune_tokens", batch_size=2)
+
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [live["jti"]]
+    assert not BlacklistedToken.objects.exists()
@@ -3,6 +3,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 User = get_user_model()
 
@@ -43,3 +44,21 @@ class TestTokenRefresh:
         response = client.post(url)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refreshed_access_token_has_current_claims(self, logged_in_client):
+        User.objects.filter(username="anja399").update(email="new@example.com")
+
+        response = logged_in_client.post(reverse("token_refresh"))
+
+        access = AccessToken(response.cookies["access_token"].value)
+        refresh = RefreshToken(response.cookies["refresh_token"].value)
+        assert access["email"] == "new@example.com"
+        assert "email" not in refresh.payload
+
+    def test_refresh_rejected_for_inactive_user(self, logged_in_client):
+        User.objects.filter(username="anja399").update(is_active=False)
+        del logged_in_client.cookies["access_token"]
+
+        response = logged_in_client.post(reverse("token_refresh"))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
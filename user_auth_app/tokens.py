@@ -0,0 +1,14 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from .blacklist import blacklist_filter
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token whose blacklist check consults `blacklist_filter` first,
+    so tokens that were never blacklisted don't cost a database query.
+    """
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
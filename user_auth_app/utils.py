@@ -1,13 +1,29 @@
 from django.conf import settings
 from django.middleware.csrf import get_token
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import USER_CLAIMS
+from .tokens import RefreshToken
 
 
 def create_tokens_for_user(user):
     """Create and return (refresh_token_str, access_token_str) for a user."""
     
     refresh = RefreshToken.for_user(user)
-    return str(refresh), str(refresh.access_token)
+    return str(refresh), str(access_token_for_user(refresh, user))
+
+
+def access_token_for_user(refresh, user):
+    """Return a new access token from `refresh` with the user's current claims.
+    The claims let the access token be verified without a database lookup
+    (see AUTH_STATELESS_TOKENS). They are only set on the short-lived access
+    token, so a refresh always picks up changes to the account."""
+    
+    for claim in USER_CLAIMS:
+        refresh.payload.pop(claim, None)
+
+    access = refresh.access_token
+    for claim in USER_CLAIMS:
+        access[claim] = getattr(user, claim)
+    return access
 
 
 def get_jwt_max_ages():
@@ -5,11 +5,13 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from .serializers import RegistrationSerializer, LoginSerializer, UserSerializer
+from .cache import token_user_cache
 
 from .utils import (
+    access_token_for_user,
     create_tokens_for_user,
     get_jwt_max_ages,
     set_auth_cookies,
@@ -88,6 +90,10 @@ class LogoutView(APIView):
         token = RefreshToken(refresh_token)
         token.blacklist() 
 
+        access_token = request.COOKIES.get("access_token")
+        if access_token:
+            token_user_cache.invalidate_token(access_token)
+
         response = Response(
             {"detail": "Log-Out successfully! All Tokens will be deleted. Refresh token is now invalid."},
             status=status.HTTP_200_OK
@@ -116,12 +122,16 @@ class RefreshTokenView(APIView):
 
         try:
             refresh = RefreshToken(refresh_token)
-            new_access_token = refresh.access_token
+            user = User.objects.get(id=refresh["user_id"])
+            if not user.is_active:
+                raise TokenError("User is inactive")
+
+            new_access_token = access_token_for_user(refresh, user)
 
             refresh.set_jti()
             new_refresh_token = str(refresh)
 
-        except TokenError:
+        except (TokenError, User.DoesNotExist):
             return Response(
                 {"detail": "Invalid refresh token."},
                 status=status.HTTP_401_UNAUTHORIZED,